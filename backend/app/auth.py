@@ -1,13 +1,17 @@
 # app/auth.py
 import os
+import threading
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
+from starlette.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as OrmSession, object_session
 from sqlmodel import Session, select
-from app.database import get_session
+from app.cache import TTLCache
+from app.database import DB_ASYNC, AsyncSessionLocal, engine
+from app.hashing import password_executor
 from app.models import User
 
 # --- KONFIGURASI KEAMANAN ---
@@ -17,20 +21,44 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # Token berlaku 24 jam
 
 # Setup Hashing Password
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# jose & passlib di-import saat pertama dipakai (bukan saat import modul) supaya cold start lebih cepat
+_pwd_context = None
+
+def get_pwd_context():
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
 
 # Setup Scheme Auth untuk Swagger UI
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Cache user yang sudah tervalidasi (key: email) supaya tiap request ber-token
+# tidak perlu query SELECT user lagi. TTL membatasi umur data kalau ada perubahan di luar ORM.
+user_cache = TTLCache(
+    "auth_user",
+    max_size=int(os.getenv("USER_CACHE_MAX_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("USER_CACHE_TTL_SECONDS", "60")),
+)
+
 # --- FUNGSI UTILITY ---
 
 def verify_password(plain_password, hashed_password):
     """Cek apakah password inputan cocok dengan hash di DB"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     """Ubah password biasa jadi kode acak (Hash)"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+async def verify_password_async(plain_password, hashed_password):
+    """verify_password di executor khusus hashing (tidak memakai threadpool route)"""
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    """get_password_hash di executor khusus hashing (tidak memakai threadpool route)"""
+    return await password_executor.run(get_password_hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Membuat JWT Token"""
@@ -41,16 +69,68 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + timedelta(minutes=15)
     
     to_encode.update({"exp": expire})
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)):
+def _detached_copy(user: User) -> User:
+    """Salinan User yang tidak terikat session mana pun (aman disimpan di cache)"""
+    return User(**user.model_dump())
+
+# Naik setiap invalidasi. User yang dibaca sebelum invalidasi tidak disimpan ke cache.
+_user_generation = 0
+_user_generation_lock = threading.Lock()
+
+def invalidate_cached_user(email: str):
+    """Hapus user dari cache. Dipanggil otomatis setelah commit yang mengubah/menghapus record User."""
+    global _user_generation
+    with _user_generation_lock:
+        _user_generation += 1
+    user_cache.invalidate(email)
+
+_PENDING_INVALIDATION = "invalidate_user_emails"
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_changed_user(mapper, connection, target):
+    # Event mapper jalan saat flush (belum commit): kalau cache dihapus di sini, request lain
+    # masih bisa membaca baris lama & menyimpannya lagi. Catat dulu, hapus setelah commit.
+    session = object_session(target)
+    emails = {target.email, *inspect(target).attrs.email.history.deleted}  # Email lama juga kalau diganti
+    if session is None:
+        for email in emails:
+            invalidate_cached_user(email)
+        return
+    session.info.setdefault(_PENDING_INVALIDATION, set()).update(emails)
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_after_commit(session):
+    for email in session.info.pop(_PENDING_INVALIDATION, ()):
+        invalidate_cached_user(email)
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_INVALIDATION, None)
+
+def _load_user(email: str) -> Optional[User]:
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.email == email)).first()
+        return _detached_copy(user) if user else None
+
+async def _load_user_async(email: str) -> Optional[User]:
+    async with AsyncSessionLocal() as session:
+        user = (await session.exec(select(User).where(User.email == email))).first()
+        return _detached_copy(user) if user else None
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     """
     Fungsi SAKTI. Dipakai di Route lain untuk:
     1. Cek apakah user kirim token?
     2. Apakah tokennya asli?
     3. Siapa pemilik token ini?
     """
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -64,11 +144,23 @@ async def get_current_user(token: str = Depends(oauth2_scheme), session: Session
     except JWTError:
         raise credentials_exception
         
-    # Cari user di database
-    statement = select(User).where(User.email == email)
-    user = session.exec(statement).first()
-    
+    # Cek cache dulu, baru cari user di database
+    cached = user_cache.get(email)
+    if cached is not None:
+        return _detached_copy(cached)
+
+    generation = _user_generation
+
+    # Fungsi ini async: query DB tidak boleh blocking di event loop.
+    # Mode async pakai AsyncSession, mode sync dijalankan di threadpool.
+    if DB_ASYNC:
+        user = await _load_user_async(email)
+    else:
+        user = await run_in_threadpool(_load_user, email)
+
     if user is None:
         raise credentials_exception
-        
-    return user
\ No newline at end of file
+
+    if generation == _user_generation:
+        user_cache.set(email, user)
+    return _detached_copy(user)
@@ -0,0 +1,96 @@
+# app/cache.py
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cache in-process hanya di-invalidasi di worker yang memproses write. Dengan beberapa worker
+# (WEB_CONCURRENCY > 1, di-set app/server.py) worker lain menyajikan data lama sampai TTL habis,
+# jadi TTL cache yang datanya bisa diubah user dipangkas ke nilai ini.
+MULTI_WORKER_CACHE_TTL_SECONDS = float(os.getenv("MULTI_WORKER_CACHE_TTL_SECONDS") or 5)
+
+
+def worker_local_ttl(name: str, ttl_seconds: float) -> float:
+    """TTL untuk cache per proses yang invalidasinya tidak sampai ke worker lain"""
+    workers = max(int(os.getenv("WEB_CONCURRENCY") or 1), 1)
+    if workers > 1 and ttl_seconds > MULTI_WORKER_CACHE_TTL_SECONDS:
+        logger.warning(
+            "Cache per worker dengan beberapa worker: TTL dipangkas",
+            extra={"cache": name, "workers": workers, "ttl_seconds": ttl_seconds,
+                   "clamped_ttl_seconds": MULTI_WORKER_CACHE_TTL_SECONDS},
+        )
+        return MULTI_WORKER_CACHE_TTL_SECONDS
+    return ttl_seconds
+
+
+class TTLCache:
+    """
+    Cache in-process sederhana: LRU dengan batas ukuran + TTL per entry.
+    Thread-safe karena route sync FastAPI jalan di threadpool.
+    """
+
+    def __init__(self, name: str, max_size: int = 1024, ttl_seconds: float = 60):
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return  # Cache dimatikan lewat config
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_where(self, predicate) -> int:
+        """Hapus semua entry yang key-nya memenuhi predicate(key). Return jumlah yang dihapus."""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,313 @@
+# app/catalog_cache.py
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, NamedTuple, Optional
+from fastapi import HTTPException, Request, Response
+from app.cache import TTLCache, worker_local_ttl
+from app.http_cache import CATALOG, is_not_modified, not_modified
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# --- KONFIGURASI CACHE KATALOG ---
+# Halaman katalog (GET /wastes/) & detail limbah (GET /wastes/{id}) disimpan sebagai body JSON jadi + ETag.
+# Backend: memory (per proses/worker) atau redis (dipakai bersama semua worker, butuh `pip install redis`).
+# Dengan memory + beberapa worker, invalidasi hanya sampai ke worker yang memproses write:
+# TTL dipangkas ke MULTI_WORKER_CACHE_TTL_SECONDS (app/cache.py). Pakai redis untuk multi worker.
+CATALOG_CACHE_BACKEND = os.getenv("CATALOG_CACHE_BACKEND", "memory").lower()
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "30"))
+CATALOG_CACHE_MAX_SIZE = int(os.getenv("CATALOG_CACHE_MAX_SIZE", "2048"))
+CATALOG_CACHE_REDIS_URL = os.getenv("CATALOG_CACHE_REDIS_URL", "")
+
+# Query param yang menentukan isi halaman katalog (param lain diabaikan supaya tidak memecah key)
+PAGE_PARAMS = (
+    "category", "min_price", "max_price", "min_weight", "max_weight",
+    "created_after", "created_before", "cursor", "limit",
+)
+
+_BACKEND_ERRORS = (redis.RedisError,) if redis is not None else ()
+
+
+class WasteSnapshot(NamedTuple):
+    """Kolom limbah yang menentukan di halaman katalog mana limbah itu muncul"""
+    id: int
+    status: Optional[str]
+    category: Optional[str]
+    price: Optional[float]
+    weight: Optional[float]
+    created_at: Optional[datetime]
+
+
+def waste_snapshot(waste) -> WasteSnapshot:
+    """Ambil sebelum & sesudah perubahan, lalu kirim keduanya ke invalidate_catalog"""
+    return WasteSnapshot(waste.id, waste.status, waste.category, waste.price, waste.weight, waste.created_at)
+
+
+class MemoryBackend:
+    """LRU + TTL di memori proses (app/cache.py)"""
+    name = "memory"
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._cache = TTLCache("catalog", max_size=max_size, ttl_seconds=ttl_seconds)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: dict, generation: int) -> bool:
+        """Simpan hanya kalau generation belum berubah. Cek & simpan di bawah lock yang sama dengan bump_generation."""
+        with self._lock:
+            if self._generation != generation:
+                return False
+            self._cache.set(key, value)
+            return True
+
+    def delete_where(self, predicate: Callable[[str], bool]) -> int:
+        return self._cache.invalidate_where(predicate)
+
+    def generation(self) -> int:
+        return self._generation
+
+    def bump_generation(self):
+        with self._lock:
+            self._generation += 1
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        return {"size": stats["size"], "max_size": stats["max_size"], "ttl_seconds": stats["ttl_seconds"]}
+
+
+# Compare-and-store di server Redis (script Lua dijalankan atomik): entry hanya disimpan kalau generation
+# belum di-bump, lalu dicatat di index (sorted set, skor = waktu kedaluwarsa) untuk delete_where.
+# KEYS: generation, entry, index. ARGV: generation yang diharapkan, value, TTL (detik), waktu kedaluwarsa.
+_SET_IF_GENERATION = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+redis.call('ZADD', KEYS[3], ARGV[4], KEYS[2])
+return 1
+"""
+
+
+class RedisBackend:
+    """Redis (atau server yang kompatibel). Entry kedaluwarsa lewat EX, ukuran dibatasi maxmemory Redis."""
+    name = "redis"
+
+    def __init__(self, client, ttl_seconds: float, prefix: str = "catalog:"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._generation_key = f"{prefix}@generation"
+        self._index_key = f"{prefix}@keys"
+        self._set_if_generation = client.register_script(_SET_IF_GENERATION)
+
+    def get(self, key: str) -> Optional[dict]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: dict, generation: int) -> bool:
+        if self.ttl_seconds <= 0:
+            return False
+        ttl = max(int(self.ttl_seconds), 1)
+        stored = self._set_if_generation(
+            keys=[self._generation_key, self.prefix + key, self._index_key],
+            args=[generation, json.dumps(value), ttl, time.time() + ttl],
+        )
+        return bool(stored)
+
+    def delete_where(self, predicate: Callable[[str], bool]) -> int:
+        """Hanya memeriksa key di index cache ini (bukan SCAN seluruh keyspace Redis)"""
+        self.client.zremrangebyscore(self._index_key, "-inf", time.time())  # Entry yang sudah kedaluwarsa
+        keys = [key for key in self.client.zrange(self._index_key, 0, -1) if predicate(key[len(self.prefix):])]
+        if keys:
+            pipe = self.client.pipeline()
+            pipe.delete(*keys)
+            pipe.zrem(self._index_key, *keys)
+            pipe.execute()
+        return len(keys)
+
+    def generation(self) -> int:
+        return int(self.client.get(self._generation_key) or 0)
+
+    def bump_generation(self):
+        self.client.incr(self._generation_key)
+
+    def stats(self) -> dict:
+        return {"size": None, "max_size": None, "ttl_seconds": self.ttl_seconds}
+
+
+class CatalogCache:
+    """
+    Cache hasil route baca katalog dengan invalidasi tepat sasaran.
+    Error backend (Redis mati) dianggap miss: API tetap jalan langsung ke DB.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.errors = 0
+
+    def _count(self, field: str, amount: int = 1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            value = self.backend.get(key)
+        except _BACKEND_ERRORS:
+            logger.warning("Catalog cache backend error (get)", exc_info=True)
+            self._count("errors")
+            value = None
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def generation(self) -> Optional[int]:
+        """Diambil sebelum query DB; dikirim lagi ke set()"""
+        try:
+            return self.backend.generation()
+        except _BACKEND_ERRORS:
+            self._count("errors")
+            return None
+
+    def set(self, key: str, value: dict, generation: Optional[int]):
+        """
+        Tidak disimpan kalau ada invalidasi selama query berjalan (hasilnya mungkin sudah basi).
+        Backend mengecek generation & menyimpan secara atomik: entry yang lolos cek pasti sudah ada
+        saat invalidate() menghapus (bump dulu, baru delete_where), jadi ikut terhapus.
+        """
+        if generation is None:
+            return
+        try:
+            self.backend.set(key, value, generation)
+        except _BACKEND_ERRORS:
+            logger.warning("Catalog cache backend error (set)", exc_info=True)
+            self._count("errors")
+
+    def invalidate(self, *snapshots: Optional[WasteSnapshot]):
+        """Hapus detail limbah ini & halaman katalog yang (sebelum/sesudah perubahan) bisa memuatnya"""
+        snapshots = [snapshot for snapshot in snapshots if snapshot is not None]
+        if not snapshots:
+            return
+        detail_keys = {detail_cache_key(snapshot.id) for snapshot in snapshots}
+        listed = [snapshot for snapshot in snapshots if snapshot.status == "available"]
+
+        def affected(key: str) -> bool:
+            if key in detail_keys:
+                return True
+            if not listed or not key.startswith("page:"):
+                return False
+            params = json.loads(key[len("page:"):])
+            return any(_page_may_contain(params, snapshot) for snapshot in listed)
+
+        try:
+            self.backend.bump_generation()
+            self._count("invalidated", self.backend.delete_where(affected))
+        except _BACKEND_ERRORS:
+            logger.warning("Catalog cache backend error (invalidate)", exc_info=True)
+            self._count("errors")
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            stats = {
+                "name": "catalog",
+                "backend": self.backend.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "invalidated": self.invalidated,
+                "errors": self.errors,
+            }
+        stats.update(self.backend.stats())
+        return stats
+
+
+def _page_may_contain(params: dict, snapshot: WasteSnapshot) -> bool:
+    """
+    Apakah limbah (status available) bisa muncul di halaman dengan filter ini.
+    Sama dengan catalog_filters + keyset cursor (created_at, id) DESC. Ragu -> True.
+    """
+    try:
+        if params.get("category") and params["category"] != snapshot.category:
+            return False
+        if "min_price" in params and snapshot.price < float(params["min_price"]):
+            return False
+        if "max_price" in params and snapshot.price > float(params["max_price"]):
+            return False
+        if "min_weight" in params and snapshot.weight < float(params["min_weight"]):
+            return False
+        if "max_weight" in params and snapshot.weight > float(params["max_weight"]):
+            return False
+        if params.get("created_after") and snapshot.created_at < datetime.fromisoformat(params["created_after"]):
+            return False
+        if params.get("created_before") and snapshot.created_at >= datetime.fromisoformat(params["created_before"]):
+            return False
+        if params.get("cursor"):
+            # Halaman setelah cursor hanya berisi baris yang lebih lama dari cursor
+            if (snapshot.created_at, snapshot.id) >= decode_cursor(params["cursor"]):
+                return False
+    except (TypeError, ValueError, HTTPException):
+        return True
+    return True
+
+
+def _create_backend():
+    if CATALOG_CACHE_BACKEND == "redis":
+        if redis is None:
+            logger.warning("CATALOG_CACHE_BACKEND=redis tapi package redis tidak terpasang, pakai memory")
+        elif not CATALOG_CACHE_REDIS_URL:
+            logger.warning("CATALOG_CACHE_REDIS_URL kosong, catalog cache pakai memory")
+        else:
+            client = redis.Redis.from_url(
+                CATALOG_CACHE_REDIS_URL, decode_responses=True, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+            return RedisBackend(client, CATALOG_CACHE_TTL_SECONDS)
+    if CATALOG_CACHE_BACKEND == "off":
+        return MemoryBackend(0, 0)
+    return MemoryBackend(CATALOG_CACHE_MAX_SIZE, worker_local_ttl("catalog", CATALOG_CACHE_TTL_SECONDS))
+
+
+catalog_cache = CatalogCache(_create_backend())
+
+
+def invalidate_catalog(*snapshots: Optional[WasteSnapshot]):
+    """Dipanggil setelah commit di route yang mengubah limbah (create, edit, delete, booking, cancel, handover)"""
+    catalog_cache.invalidate(*snapshots)
+
+
+def page_cache_key(request: Request) -> str:
+    params = {name: request.query_params[name] for name in PAGE_PARAMS if name in request.query_params}
+    return "page:" + json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+
+def detail_cache_key(waste_id: int) -> str:
+    return f"detail:{waste_id}"
+
+
+def json_body(content: Any) -> str:
+    """Serialisasi sama persis dengan JSONResponse FastAPI"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+
+
+def cached_response(request: Request, entry: dict) -> Response:
+    """Response dari entry cache ({"etag", "body", "next_cursor"}), tanpa query & tanpa serialisasi ulang"""
+    if is_not_modified(request, entry["etag"]):
+        return not_modified(entry["etag"], CATALOG)
+    headers = {"ETag": entry["etag"], "Cache-Control": CATALOG}
+    if entry.get("next_cursor"):
+        headers[NEXT_CURSOR_HEADER] = entry["next_cursor"]
+    return Response(entry["body"], media_type="application/json", headers=headers)
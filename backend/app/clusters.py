@@ -0,0 +1,121 @@
+# app/clusters.py
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from sqlmodel import Session, select, func, and_, or_
+from app.cache import TTLCache, worker_local_ttl
+from app.geo import cover_bbox, prefix_upper_bound
+from app.models import Waste
+
+# Zoom peta (Leaflet 0-20) -> panjang geohash untuk satu cluster.
+# Zoom kecil = cluster besar (prefix pendek), zoom besar = cluster kecil.
+ZOOM_PRECISION = [
+    (3, 1), (5, 2), (8, 3), (10, 4), (13, 5), (15, 6), (18, 7),
+]
+MAX_CLUSTER_PRECISION = 8
+
+# Cache hasil cluster per tile. Key: (presisi_cluster, prefix_tile).
+# Satu tile = satu sel geohash yang lebih kasar dari cluster di dalamnya.
+cluster_cache = TTLCache(
+    "map_clusters",
+    max_size=int(os.getenv("CLUSTER_CACHE_MAX_SIZE", "2048")),
+    ttl_seconds=worker_local_ttl("map_clusters", float(os.getenv("CLUSTER_CACHE_TTL_SECONDS", "300"))),
+)
+
+# Naik setiap invalidasi. Hasil query yang mulai sebelum invalidasi tidak disimpan ke cache.
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def precision_for_zoom(zoom: int) -> int:
+    for max_zoom, precision in ZOOM_PRECISION:
+        if zoom < max_zoom:
+            return precision
+    return MAX_CLUSTER_PRECISION
+
+
+def invalidate_clusters(*geohashes: Optional[str]):
+    """
+    Hapus tile cluster yang memuat geohash ini.
+    Dipanggil setelah commit di route yang mengubah limbah available (create, edit, booking, cancel, delete).
+    """
+    global _generation
+    targets = [geohash for geohash in geohashes if geohash]
+    if not targets:
+        return
+    with _generation_lock:
+        _generation += 1
+    cluster_cache.invalidate_where(
+        lambda key: any(geohash.startswith(key[1]) for geohash in targets)
+    )
+
+
+def _query_tiles(session: Session, precision: int, tiles: List[str], category: Optional[str]) -> Dict[str, List[dict]]:
+    """Satu query GROUP BY (cell, category) untuk semua tile yang belum ada di cache"""
+    cell = func.substr(Waste.geohash, 1, precision)
+    query = select(
+        cell,
+        Waste.category,
+        func.count(Waste.id),
+        func.sum(Waste.weight),
+        func.sum(Waste.latitude),
+        func.sum(Waste.longitude),
+    ).where(
+        Waste.status == "available",
+        or_(*[and_(Waste.geohash >= tile, Waste.geohash < prefix_upper_bound(tile)) for tile in tiles]),
+    ).group_by(cell, Waste.category)
+    if category:
+        query = query.where(Waste.category == category)
+
+    cells = defaultdict(lambda: {"count": 0, "weight": 0.0, "lat": 0.0, "lon": 0.0, "categories": {}})
+    for cell_hash, cell_category, count, weight, lat_sum, lon_sum in session.exec(query).all():
+        stats = cells[cell_hash]
+        stats["count"] += count
+        stats["weight"] += float(weight or 0)
+        stats["lat"] += float(lat_sum)
+        stats["lon"] += float(lon_sum)
+        stats["categories"][cell_category] = count
+
+    per_tile = {tile: [] for tile in tiles}
+    for cell_hash, stats in cells.items():
+        tile = next(tile for tile in tiles if cell_hash.startswith(tile))
+        per_tile[tile].append({
+            "geohash": cell_hash,
+            "latitude": stats["lat"] / stats["count"],
+            "longitude": stats["lon"] / stats["count"],
+            "count": stats["count"],
+            "total_weight": round(stats["weight"], 2),
+            "dominant_category": max(stats["categories"].items(), key=lambda item: (item[1], item[0]))[0],
+        })
+    return per_tile
+
+
+def get_clusters(
+    session: Session,
+    zoom: int,
+    bbox: Tuple[float, float, float, float],
+    category: Optional[str] = None,
+) -> Tuple[int, List[dict]]:
+    """Cluster untuk viewport: ambil per tile dari cache, sisanya dihitung sekaligus di DB"""
+    precision = precision_for_zoom(zoom)
+    tiles = cover_bbox(*bbox, max_precision=max(precision - 1, 1))
+
+    clusters = []
+    missing = []
+    for tile in tiles:
+        cached = cluster_cache.get((precision, tile, category))
+        if cached is None:
+            missing.append(tile)
+        else:
+            clusters.extend(cached)
+
+    if missing:
+        generation = _generation
+        fresh = _query_tiles(session, precision, missing, category)
+        for tile, tile_clusters in fresh.items():
+            if generation == _generation:
+                cluster_cache.set((precision, tile, category), tile_clusters)
+            clusters.extend(tile_clusters)
+
+    return precision, clusters
@@ -1,7 +1,14 @@
 # app/database.py
+import logging
 import os
 from pathlib import Path
-from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import URL, inspect, make_url, text
+from sqlalchemy.pool import QueuePool
+from sqlmodel import SQLModel, create_engine, Session, select
+from app.db_metrics import PoolMetrics, instrument_pool_events, timed_pool_class
+from app.metrics import instrument_engine
+
+logger = logging.getLogger(__name__)
 
 # Try to load .env file (for local development)
 try:
@@ -9,7 +16,7 @@ try:
     env_path = Path(__file__).resolve().parent.parent / '.env'
     if env_path.exists():
         load_dotenv(dotenv_path=env_path)
-        print("[Database] Loaded .env file")
+        logger.info("Loaded .env file")
 except ImportError:
     pass  # dotenv not installed, use system env vars
 
@@ -21,25 +28,182 @@ if not DATABASE_URL:
 
 # Debug: Print to verify correct URL is loaded (hide password)
 url_display = DATABASE_URL.split('@')[1] if '@' in DATABASE_URL else DATABASE_URL
-print(f"[Database] Connecting to: ...@{url_display}")
+logger.info("Connecting to database", extra={"database": f"...@{url_display}"})
 
 # Handle Heroku/Railway style postgres:// URLs (convert to postgresql://)
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# --- KONFIGURASI CONNECTION POOL (per proses) ---
+# Total koneksi maksimal = DB_POOL_SIZE + DB_MAX_OVERFLOW per engine, sesuaikan dengan max_connections Postgres.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # Detik menunggu koneksi kosong
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "300"))  # Recycle connections after 5 minutes
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")  # Check connection health before using
+
+# Mode async (lihat bawah): engine kedua, jatah koneksi ikut dibagi
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Multi worker (app/server.py): DB_MAX_CONNECTIONS = jatah koneksi Postgres untuk SEMUA worker.
+# Jatah dibagi rata per worker (WEB_CONCURRENCY) dan per engine (sync + async kalau DB_ASYNC),
+# DB_POOL_SIZE / DB_MAX_OVERFLOW dipangkas kalau melebihi bagiannya. 0 = tanpa batas (perilaku lama).
+# `or`: variabel kosong di .env (WEB_CONCURRENCY=) sama dengan tidak di-set
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS") or 0)
+WEB_CONCURRENCY = max(int(os.getenv("WEB_CONCURRENCY") or 1), 1)
+
+def connections_per_engine(engine_count: int) -> int:
+    """Batas koneksi (pool_size + max_overflow) tiap engine di proses ini"""
+    if DB_MAX_CONNECTIONS <= 0:
+        return DB_POOL_SIZE + DB_MAX_OVERFLOW
+    share = DB_MAX_CONNECTIONS // (WEB_CONCURRENCY * engine_count)
+    if share < 1:
+        raise ValueError(
+            f"DB_MAX_CONNECTIONS={DB_MAX_CONNECTIONS} terlalu kecil untuk "
+            f"{WEB_CONCURRENCY} worker x {engine_count} engine"
+        )
+    return min(share, DB_POOL_SIZE + DB_MAX_OVERFLOW)
+
+def pool_options(pool_class) -> dict:
+    limit = connections_per_engine(2 if DB_ASYNC else 1)
+    pool_size = min(DB_POOL_SIZE, limit)
+    return {
+        "poolclass": pool_class,
+        "pool_size": pool_size,
+        "max_overflow": limit - pool_size,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
 # Create engine with connection pool settings for production
+pool_metrics = PoolMetrics("sync")
+_pool_options = pool_options(timed_pool_class(QueuePool, pool_metrics))
 engine = create_engine(
     DATABASE_URL,
     echo=False,  # Set to True for debugging SQL queries
-    pool_pre_ping=True,  # Check connection health before using
-    pool_recycle=300,  # Recycle connections after 5 minutes
+    **_pool_options,
 )
+instrument_pool_events(engine, pool_metrics)
+instrument_engine(engine)  # Jumlah statement & waktu DB per request (app/metrics.py)
+
+# --- MODE ASYNC (opsional) ---
+# DB_ASYNC=true: route katalog & auth memakai AsyncSession (asyncpg / aiosqlite),
+# jadi query tidak memblokir event loop dan tidak antre di threadpool Starlette.
+# Engine sync di atas tetap dipakai untuk DDL startup & route lain.
+
+def async_database_url(url: str) -> URL:
+    """postgresql:// -> postgresql+asyncpg://, sqlite:// -> sqlite+aiosqlite://"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+        # asyncpg tidak kenal sslmode (format libpq), namanya ssl
+        if "sslmode" in url.query:
+            url = url.update_query_dict({"ssl": url.query["sslmode"]}).difference_update_query(["sslmode"])
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url
+
+async_engine = None
+AsyncSessionLocal = None
+async_pool_metrics = None
+if DB_ASYNC:
+    # Import di sini: sqlalchemy.ext.asyncio cukup berat dan tidak perlu dimuat di mode sync
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    async_pool_metrics = PoolMetrics("async")
+    _async_pool_options = pool_options(timed_pool_class(AsyncAdaptedQueuePool, async_pool_metrics))
+    async_engine = create_async_engine(
+        async_database_url(DATABASE_URL),
+        echo=False,
+        **_async_pool_options,
+    )
+    instrument_pool_events(async_engine.sync_engine, async_pool_metrics)
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 def create_db_and_tables():
     """Create all database tables based on SQLModel metadata"""
+    rollup_table_existed = inspect(engine).has_table("impactrollup")
     SQLModel.metadata.create_all(engine)
+    added_columns = apply_column_migrations()
+    apply_index_migrations()
+
+    # Index full-text (GIN / FTS5) spesifik dialect, tidak bisa lewat metadata SQLModel
+    from app.search import setup_fulltext
+    setup_fulltext(engine)
+
+    # Kolom geohash baru ditambahkan ke tabel lama: isi dari koordinat yang sudah ada
+    if ("waste", "geohash") in added_columns:
+        backfill_waste_geohash()
+
+    # Database lama: tabel rollup baru dibuat, isi dari data yang sudah ada
+    if not rollup_table_existed:
+        from app.rollups import rebuild_rollups
+        with Session(engine) as session:
+            rebuild_rollups(session)
+            session.commit()
+
+def apply_column_migrations():
+    """
+    create_all tidak menambah kolom baru ke tabel yang sudah ada.
+    Tambahkan kolom nullable yang belum ada (ALTER TABLE ... ADD COLUMN).
+    Return daftar (nama_tabel, nama_kolom) yang baru ditambahkan.
+    """
+    added = []
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+                ))
+                added.append((table.name, column.name))
+    return added
+
+def backfill_waste_geohash():
+    """Isi Waste.geohash untuk baris lama yang sudah punya koordinat"""
+    from app.models import Waste
+    from app.geo import encode_geohash
+
+    with Session(engine) as session:
+        query = select(Waste).where(Waste.latitude.is_not(None), Waste.longitude.is_not(None))
+        for waste in session.exec(query).all():
+            waste.geohash = encode_geohash(waste.latitude, waste.longitude)
+            session.add(waste)
+        session.commit()
+
+def apply_index_migrations():
+    """
+    create_all hanya membuat index untuk tabel yang BARU dibuat.
+    Untuk database lama (tabel sudah ada), buat index yang belum ada satu per satu.
+    """
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 def get_session():
     """Dependency to get database session"""
     with Session(engine) as session:
         yield session
+
+def pool_stats() -> list:
+    """Status & counter semua pool (untuk endpoint metrics internal)"""
+    stats = [pool_metrics.stats(engine.pool, _pool_options)]
+    if async_engine is not None:
+        stats.append(async_pool_metrics.stats(async_engine.pool, _async_pool_options))
+    return stats
+
+async def get_async_session():
+    """Dependency AsyncSession (hanya tersedia kalau DB_ASYNC=true)"""
+    async with AsyncSessionLocal() as session:
+        yield session
@@ -0,0 +1,102 @@
+# app/db_metrics.py
+import threading
+import time
+from sqlalchemy import event, exc
+
+
+class PoolMetrics:
+    """
+    Counter connection pool: checkout, waktu tunggu, pemakaian overflow, invalidasi.
+    Dipakai untuk menentukan ukuran pool vs batas koneksi PostgreSQL.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.overflow_checkouts = 0
+        self.peak_checked_out = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.waits = 0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.waits += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def stats(self, pool, options: dict) -> dict:
+        """options = kwargs pool yang dipakai saat membuat engine (database.pool_options)"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "status": pool.status(),
+                "pool_size": pool.size(),
+                "max_overflow": options["max_overflow"],
+                "timeout_seconds": pool.timeout(),
+                "pre_ping": options["pool_pre_ping"],
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "overflow_checkouts": self.overflow_checkouts,
+                "peak_checked_out": self.peak_checked_out,
+                "wait_ms_avg": round(self.wait_total / self.waits * 1000, 3) if self.waits else 0.0,
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+            }
+
+
+def timed_pool_class(base, metrics: PoolMetrics):
+    """Subclass pool yang mencatat lama menunggu koneksi (termasuk yang timeout)"""
+
+    class TimedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            except exc.TimeoutError:
+                with metrics._lock:
+                    metrics.timeouts += 1
+                raise
+            finally:
+                metrics.record_wait(time.perf_counter() - start)
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def instrument_pool_events(engine, metrics: PoolMetrics):
+    """Pasang listener pool event ke engine sync (untuk AsyncEngine pakai .sync_engine)"""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.connects += 1
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool = engine.pool
+        with metrics._lock:
+            metrics.checkouts += 1
+            metrics.peak_checked_out = max(metrics.peak_checked_out, pool.checkedout())
+            if pool.overflow() > 0:
+                metrics.overflow_checkouts += 1
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.checkins += 1
+
+    @event.listens_for(engine, "invalidate")
+    @event.listens_for(engine, "soft_invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        with metrics._lock:
+            metrics.invalidations += 1
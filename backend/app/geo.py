@@ -0,0 +1,117 @@
+# app/geo.py
+import math
+from typing import List, Tuple
+
+# Alfabet base32 geohash (tanpa a, i, l, o)
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9  # ~5m, presisi yang disimpan di kolom Waste.geohash
+MAX_COVER_CELLS = 32   # Batas jumlah sel (range scan) per query
+EARTH_RADIUS_KM = 6371.0
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Koordinat -> geohash. Prefix yang sama = lokasi berdekatan (bisa di-index btree biasa)"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """Ukuran satu sel geohash dalam derajat (lat, lon)"""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Jarak dua titik di permukaan bumi (km)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bbox_around(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """Bounding box (min_lat, min_lon, max_lat, max_lon) yang memuat lingkaran radius_km"""
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    d_lon = min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+    return (
+        max(latitude - d_lat, -90.0),
+        max(longitude - d_lon, -180.0),
+        min(latitude + d_lat, 90.0),
+        min(longitude + d_lon, 180.0),
+    )
+
+
+def cover_bbox(
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    max_precision: int = GEOHASH_PRECISION,
+) -> List[str]:
+    """
+    Daftar prefix geohash yang menutupi bounding box.
+    Pilih presisi paling tinggi (maksimal max_precision) yang jumlah selnya masih <= MAX_COVER_CELLS,
+    jadi query hanya menyentuh sel di sekitar area (bukan seluruh katalog).
+    """
+    for precision in range(max_precision, 0, -1):
+        cell_lat, cell_lon = cell_size(precision)
+        rows = math.floor(max_lat / cell_lat) - math.floor(min_lat / cell_lat) + 1
+        cols = math.floor(max_lon / cell_lon) - math.floor(min_lon / cell_lon) + 1
+        if rows * cols <= MAX_COVER_CELLS:
+            break
+
+    cells = set()
+    for row in range(rows):
+        lat = min(min_lat + row * cell_lat, max_lat)
+        for col in range(cols):
+            lon = min(min_lon + col * cell_lon, max_lon)
+            cells.add(encode_geohash(lat, lon, precision))
+        cells.add(encode_geohash(lat, max_lon, precision))
+    for col in range(cols):
+        cells.add(encode_geohash(max_lat, min(min_lon + col * cell_lon, max_lon), precision))
+    cells.add(encode_geohash(max_lat, max_lon, precision))
+    return sorted(cells)
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """
+    Batas atas (eksklusif) untuk range scan prefix: 'u6q' -> 'u6r'.
+    Dipakai sebagai pengganti LIKE 'u6q%' supaya index btree terpakai di semua collation.
+    """
+    chars = list(prefix)
+    while chars:
+        index = GEOHASH_ALPHABET.index(chars[-1])
+        if index + 1 < len(GEOHASH_ALPHABET):
+            chars[-1] = GEOHASH_ALPHABET[index + 1]
+            return "".join(chars)
+        chars.pop()
+    return "~"  # Prefix 'zzz...' -> sampai akhir
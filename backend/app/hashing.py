@@ -0,0 +1,73 @@
+# app/hashing.py
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+
+
+class BoundedExecutor:
+    """
+    Executor khusus untuk kerja CPU berat (bcrypt) dengan batas concurrency & antrian.
+    Threadpool bawaan Starlette dipakai semua route sync, jadi hashing password
+    dipisah ke sini supaya login storm tidak menghabiskan thread untuk route lain.
+    bcrypt melepas GIL saat hashing, jadi thread sudah cukup (tidak perlu process pool).
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, fn, *args):
+        """Jalankan fn(*args) di executor. Antrian penuh -> 503 (client boleh retry)"""
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Server sedang sibuk, coba lagi sebentar")
+            self.queued += 1
+        future = self._executor.submit(self._call, fn, args)
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+
+    def _on_done(self, future):
+        # Request dibatalkan sebelum sempat jalan (client disconnect) -> keluarkan dari antrian
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def _call(self, fn, args):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "active": self.active,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+password_executor = BoundedExecutor(
+    "password-hash",
+    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64")),
+)
@@ -0,0 +1,58 @@
+# app/http_cache.py
+import hashlib
+import re
+from pathlib import Path
+from fastapi import Request, Response
+from fastapi.staticfiles import StaticFiles
+
+# --- KONFIGURASI CACHE-CONTROL ---
+# File content-addressed (nama = sha256 isi) tidak akan pernah berubah isinya
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Upload lama (nama timestamp) masih bisa di-cache, tapi tidak selamanya
+LEGACY_UPLOAD = "public, max-age=86400"
+# Katalog & detail: boleh dipakai ulang sebentar, setelah itu revalidasi pakai ETag
+CATALOG = "public, max-age=30, must-revalidate"
+# Rekomendasi harga murni fungsi dari input (kategori, berat)
+PRICE_RECOMMENDATION = "public, max-age=86400"
+
+CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{64}(_[a-z]+)?\.[a-z0-9]+$")
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag dari gabungan nilai (versi baris, filter query, dll)"""
+    raw = "|".join(str(part) for part in parts)
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Cek header If-None-Match (bisa berisi beberapa ETag atau '*')"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    # Perbandingan weak: abaikan prefix W/
+    bare = etag.removeprefix("W/")
+    return "*" in candidates or any(tag.removeprefix("W/") == bare for tag in candidates)
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def upload_cache_control(path: str) -> str:
+    return IMMUTABLE if CONTENT_ADDRESSED_NAME.match(Path(path).name) else LEGACY_UPLOAD
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles + Cache-Control. ETag & If-None-Match sudah ditangani StaticFiles."""
+
+    def lookup_path(self, path):
+        # File/folder tersembunyi (mis. sisa staging .tmp/ lama) & file .part setengah jadi tidak pernah di-serve
+        if path.endswith(".part") or any(part.startswith(".") for part in Path(path).parts):
+            return "", None
+        return super().lookup_path(path)
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = upload_cache_control(str(full_path))
+        return response
@@ -0,0 +1,128 @@
+# app/images.py
+import os
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Batas resolusi gambar (lebar x tinggi). PNG kecil bisa berisi jutaan piksel (decompression bomb):
+# dicek dari header sebelum piksel di-decode. 40MP cukup untuk foto HP.
+MAX_IMAGE_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS") or 40_000_000)
+
+# Pillow opsional: tanpa Pillow upload tetap jalan, hanya varian ukuran yang tidak dibuat
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError, features
+    # Pengaman kedua di dalam Pillow (DecompressionBombError di atas 2x batas ini)
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+except ImportError:
+    Image = None
+
+
+class ImageTooLarge(ValueError):
+    """Resolusi gambar melebihi MAX_IMAGE_PIXELS"""
+
+
+# Nama varian -> sisi terpanjang (px). Gambar tidak pernah di-upscale.
+IMAGE_VARIANTS = {
+    "thumb": 200,
+    "card": 480,
+    "full": 1280,
+}
+
+@lru_cache(maxsize=None)
+def variant_format() -> Tuple[str, str]:
+    """(format Pillow, ekstensi) varian. Dicek saat pertama dipakai: memuat modul webp cukup lambat saat startup"""
+    if Image is not None and features.check("webp"):
+        return "WEBP", ".webp"
+    return "JPEG", ".jpg"
+
+VARIANT_QUALITY = 80
+
+
+def variant_path(original: Path, variant: str) -> Path:
+    """uploads/abc.png + 'thumb' -> uploads/abc_thumb.webp (disimpan di sebelah file asli)"""
+    return original.with_name(f"{original.stem}_{variant}{variant_format()[1]}")
+
+
+def is_variant(path: Path) -> bool:
+    """abc_thumb.webp, abc_card.jpg, ... (hasil variant_path, bukan file asli)"""
+    return any(path.name.endswith(f"_{variant}{variant_format()[1]}") for variant in IMAGE_VARIANTS)
+
+
+def _save_variant(image, target: Path):
+    fmt = variant_format()[0]
+    # JPEG tidak punya alpha channel
+    if fmt == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    # Nama .part unik: dua request yang membuat varian yang sama tidak saling menimpa file setengah jadi
+    tmp_path = target.with_name(f"{target.name}.{uuid.uuid4().hex}.part")
+    try:
+        image.save(tmp_path, fmt, quality=VARIANT_QUALITY)
+        tmp_path.replace(target)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _open_image(original: Path, max_side: int):
+    """
+    Buka gambar yang sudah diperkecil ke max_side. Resolusi dicek dari header sebelum decode,
+    JPEG di-decode langsung di skala kecil (draft), konversi mode dilakukan setelah diperkecil.
+    """
+    try:
+        with Image.open(original) as source:
+            if source.width * source.height > MAX_IMAGE_PIXELS:
+                raise ImageTooLarge(f"{source.width}x{source.height}")
+            source.draft(None, (max_side, max_side))
+            image = source
+            if image.mode in ("1", "P"):
+                # Resize mode 1/P selalu nearest: perkecil kasar dulu, konversi di ukuran kecil
+                image.thumbnail((max_side * 2, max_side * 2))
+                image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+            image.thumbnail((max_side, max_side))
+            image = ImageOps.exif_transpose(image)  # Hormati orientasi foto dari HP
+    except Image.DecompressionBombError as e:
+        raise ImageTooLarge(str(e)) from e
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    return image
+
+
+def generate_variants(original: Path) -> Dict[str, Path]:
+    """
+    Buat semua varian untuk satu file upload. CPU-bound, panggil dari threadpool.
+    Return {} kalau Pillow tidak ada atau file bukan gambar yang bisa dibaca.
+    ImageTooLarge kalau resolusinya melebihi MAX_IMAGE_PIXELS.
+    """
+    if Image is None:
+        return {}
+    try:
+        image = _open_image(original, max(IMAGE_VARIANTS.values()))
+    except (UnidentifiedImageError, OSError):
+        return {}
+
+    # Satu gambar diperkecil bertahap dari varian terbesar ke terkecil, tanpa salinan per varian
+    created = {}
+    for variant, max_side in sorted(IMAGE_VARIANTS.items(), key=lambda item: -item[1]):
+        image.thumbnail((max_side, max_side))
+        target = variant_path(original, variant)
+        if not target.exists():
+            _save_variant(image, target)
+        created[variant] = target
+    return {variant: created[variant] for variant in IMAGE_VARIANTS}
+
+
+def ensure_variant(original: Path, variant: str) -> Optional[Path]:
+    """Varian untuk file lama dibuat saat pertama diminta (lazy). None = tidak bisa dibuat."""
+    if is_variant(original) or original.name.endswith(".part"):
+        return None  # Varian dari varian / file setengah jadi tidak pernah dibuat
+    target = variant_path(original, variant)
+    if target.exists():
+        return target
+    if Image is None:
+        return None
+    try:
+        image = _open_image(original, IMAGE_VARIANTS[variant])
+    except (UnidentifiedImageError, OSError, ImageTooLarge):
+        return None
+    _save_variant(image, target)
+    return target
@@ -0,0 +1,38 @@
+# app/impact.py
+from datetime import datetime, timedelta
+from typing import List, Tuple
+from sqlmodel import Session
+from app.models import User
+from app.rollups import monthly_totals
+
+# Rumus Dampak: 1 Kg sampah = 0.5 Kg CO2 dicegah, 1 pohon menyerap ~21 Kg CO2/tahun
+CO2_PER_KG = 0.5
+CO2_PER_TREE = 21
+
+
+def last_six_months(today: datetime) -> List[Tuple[str, str]]:
+    """Daftar (month_key 'YYYY-MM', nama bulan) dari 5 bulan lalu sampai bulan ini"""
+    months = []
+    for i in range(5, -1, -1):
+        target_date = today - timedelta(days=30 * i)
+        months.append((target_date.strftime('%Y-%m'), target_date.strftime('%b')))
+    return months
+
+
+def build_trend_data(session: Session, user: User, today: datetime) -> List[dict]:
+    """6 bucket bulanan siap pakai untuk chart (dibaca dari ImpactRollup)"""
+    months = last_six_months(today)
+    totals = monthly_totals(session, user.id, since_month=months[0][0])
+
+    trend_data = []
+    for month_key, month_name in months:
+        weight, revenue = totals.get(month_key, (0.0, 0.0))
+        co2 = weight * CO2_PER_KG
+        trend_data.append({
+            'month': month_name,
+            'limbah': round(weight, 2),
+            'co2': round(co2, 2),
+            'revenue': round(revenue, 0),
+            'trees': round(co2 / CO2_PER_TREE, 1)
+        })
+    return trend_data
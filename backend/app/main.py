@@ -1,23 +1,53 @@
+import time
+_import_started = time.perf_counter()  # Titik nol pengukuran startup (lihat startup_timings)
+
+import logging
 import os
+import secrets
 import sys
+from typing import Optional
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Debug: Print Python version and environment
-print(f"[Main] Python version: {sys.version}")
-print(f"[Main] DATABASE_URL set: {bool(os.getenv('DATABASE_URL'))}")
-print(f"[Main] SECRET_KEY set: {bool(os.getenv('SECRET_KEY'))}")
+# Logging terstruktur dipasang sebelum import modul lain supaya log saat import ikut terformat
+from app.logging_config import RequestIdMiddleware, setup_logging
+setup_logging()
+logger = logging.getLogger("app.main")
+
+logger.info(
+    "Starting API process",
+    extra={
+        "python_version": sys.version.split()[0],
+        "database_url_set": bool(os.getenv("DATABASE_URL")),
+        "secret_key_set": bool(os.getenv("SECRET_KEY")),
+    },
+)
 
-from app.database import create_db_and_tables
+from app.database import DB_ASYNC, async_engine, create_db_and_tables, pool_stats
+from app.auth import user_cache
+from app.catalog_cache import catalog_cache
+from app.clusters import cluster_cache
+from app.hashing import password_executor
+from app.http_cache import CachedStaticFiles
+from app.metrics import RequestMetricsMiddleware, render_prometheus
 # Import routers yang baru dibuat
 from app.routes import auth, wastes, transactions, upload
 
-print("[Main] All imports successful")
+logger.debug("All imports successful")
+
+# --- STARTUP ---
+# DB_MIGRATE_ON_STARTUP=false (production): DDL schema dijalankan terpisah lewat `python -m app.migrate`
+# (release phase), worker tidak introspeksi schema & tidak membuka koneksi DB saat boot.
+DB_MIGRATE_ON_STARTUP = os.getenv("DB_MIGRATE_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# Durasi tiap fase startup (ms), ikut ditampilkan di /health
+_imports_done = time.perf_counter()
+startup_timings = {"imports_ms": round((_imports_done - _import_started) * 1000, 1)}
 
 app = FastAPI(title="Lumbung Sirkular API")
 
@@ -46,17 +76,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Request-ID"],  # Supaya frontend bisa baca cursor pagination & request id
 )
 
+# Catat latency, jumlah query & waktu DB per request (lihat /metrics)
+app.add_middleware(RequestMetricsMiddleware)
+# Paling luar: request id sudah ada sejak awal request (ikut ke log slow request)
+app.add_middleware(RequestIdMiddleware)
+
 @app.on_event("startup")
 def on_startup():
-    print("[Main] Starting up...")
-    try:
-        create_db_and_tables()
-        print("[Main] Database tables created successfully")
-    except Exception as e:
-        print(f"[Main] ERROR creating database tables: {e}")
-        raise e
+    logger.info("Starting up...")
+    schema_started = time.perf_counter()
+    if DB_MIGRATE_ON_STARTUP:
+        try:
+            create_db_and_tables()
+            logger.info("Database tables created successfully")
+        except Exception:
+            logger.exception("ERROR creating database tables")
+            raise
+    else:
+        logger.info("Skipping schema DDL (DB_MIGRATE_ON_STARTUP=false)")
+    startup_timings["schema_ms"] = round((time.perf_counter() - schema_started) * 1000, 1)
+    startup_timings["total_ms"] = round((time.perf_counter() - _import_started) * 1000, 1)
+    logger.info("Startup complete", extra=startup_timings)
 
 @app.get("/")
 def read_root():
@@ -64,9 +107,49 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "message": "API is running"}
+    return {
+        "status": "healthy",
+        "message": "API is running",
+        "caches": [user_cache.stats(), cluster_cache.stats(), catalog_cache.stats()],
+        "executors": [password_executor.stats()],
+        "startup": startup_timings,
+    }
+
+# Endpoint internal: status & counter connection pool untuk sizing pool vs max_connections Postgres.
+# Tertutup secara default. Kalau INTERNAL_METRICS_TOKEN di-set, wajib kirim header X-Internal-Token yang sama;
+# kalau tidak di-set, hanya boleh diakses langsung dari localhost (bukan lewat proxy).
+INTERNAL_METRICS_TOKEN = os.getenv("INTERNAL_METRICS_TOKEN")
+LOOPBACK_HOSTS = {"127.0.0.1", "::1"}
+
+def require_internal_token(request: Request, x_internal_token: Optional[str] = Header(default=None)):
+    if INTERNAL_METRICS_TOKEN:
+        allowed = secrets.compare_digest(x_internal_token or "", INTERNAL_METRICS_TOKEN)
+    else:
+        # Request lewat proxy membawa X-Forwarded-For / Forwarded, dan client.host-nya bisa berasal dari header itu
+        proxied = "x-forwarded-for" in request.headers or "forwarded" in request.headers
+        allowed = not proxied and request.client is not None and request.client.host in LOOPBACK_HOSTS
+    if not allowed:
+        raise HTTPException(status_code=403, detail="Endpoint internal")
+
+@app.get("/health/pool", dependencies=[Depends(require_internal_token)])
+def pool_metrics_check():
+    return {"pools": pool_stats()}
+
+# Metrics per route (latency, jumlah SQL, waktu DB, ukuran response) format Prometheus
+@app.get("/metrics", dependencies=[Depends(require_internal_token)], include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    if async_engine is not None:
+        await async_engine.dispose()
 
 # Pasang Router
+# Mode async: route baca katalog versi async didaftarkan lebih dulu supaya menang saat routing
+if DB_ASYNC:
+    from app.routes import wastes_async
+    app.include_router(wastes_async.router)
 app.include_router(auth.router)
 app.include_router(wastes.router)
 app.include_router(transactions.router)
@@ -75,4 +158,8 @@ app.include_router(upload.router)
 # Mount static files untuk serve gambar yang diupload
 # Create uploads directory if it doesn't exist
 os.makedirs("uploads", exist_ok=True)
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Cache-Control: immutable untuk file content-addressed (lihat app/http_cache.py)
+app.mount("/uploads", CachedStaticFiles(directory="uploads"), name="uploads")
+
+# Middleware, router & static mount
+startup_timings["app_setup_ms"] = round((time.perf_counter() - _imports_done) * 1000, 1)
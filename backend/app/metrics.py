@@ -0,0 +1,187 @@
+# app/metrics.py
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# --- KONFIGURASI ---
+# Request lebih lambat dari ini dicatat ke log beserta query paling lambat
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_TOP_QUERIES = 5
+MAX_RECORDED_QUERIES = 200  # Batas query yang disimpan per request (untuk log slow request)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Histogram:
+    """Histogram ala Prometheus (bucket kumulatif + _sum + _count) per kombinasi label"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [count per bucket..., +Inf count, sum]
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            base = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+ROUTE_LABELS = ("method", "route")
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Latency request per route", ROUTE_LABELS, LATENCY_BUCKETS
+)
+request_db_statements = Histogram(
+    "http_request_db_statements", "Jumlah statement SQL per request", ROUTE_LABELS, STATEMENT_BUCKETS
+)
+request_db_duration = Histogram(
+    "http_request_db_duration_seconds", "Total waktu DB per request", ROUTE_LABELS, LATENCY_BUCKETS
+)
+response_size = Histogram(
+    "http_response_size_bytes", "Ukuran body response", ROUTE_LABELS, SIZE_BUCKETS
+)
+HISTOGRAMS = (request_duration, request_db_statements, request_db_duration, response_size)
+
+_requests_total: Dict[tuple, int] = {}
+_requests_lock = threading.Lock()
+
+
+class RequestStats:
+    """Statistik DB untuk satu request (diisi listener engine lewat contextvar)"""
+    __slots__ = ("statements", "db_seconds", "queries")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.queries: List[Tuple[float, str]] = []
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def instrument_engine(engine):
+    """Hitung statement & waktu DB per request. Untuk AsyncEngine pakai .sync_engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = _current_stats.get()
+        if stats is None:
+            return  # Di luar request (startup, CLI)
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        if len(stats.queries) < MAX_RECORDED_QUERIES:
+            stats.queries.append((elapsed, statement))
+
+
+class RequestMetricsMiddleware:
+    """
+    Middleware ASGI: latency, jumlah statement SQL, waktu DB & ukuran response per route.
+    Label route memakai template path (/wastes/{waste_id}), bukan URL mentah.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        status_code = 500
+        body_size = 0
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code, body_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_stats.reset(token)
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else "unmatched")
+            request_duration.observe(labels, elapsed)
+            request_db_statements.observe(labels, stats.statements)
+            request_db_duration.observe(labels, stats.db_seconds)
+            response_size.observe(labels, body_size)
+            with _requests_lock:
+                key = labels + (str(status_code),)
+                _requests_total[key] = _requests_total.get(key, 0) + 1
+            if elapsed * 1000 >= SLOW_REQUEST_MS:
+                _log_slow_request(labels, status_code, elapsed, stats)
+
+
+def _log_slow_request(labels: tuple, status_code: int, elapsed: float, stats: RequestStats):
+    slowest = sorted(stats.queries, key=lambda item: item[0], reverse=True)[:SLOW_REQUEST_TOP_QUERIES]
+    queries = "".join(
+        f"\n  {seconds * 1000:.1f} ms  {' '.join(statement.split())[:300]}" for seconds, statement in slowest
+    )
+    logger.warning(
+        "Slow request %s %s -> %s in %.0f ms (%d SQL, %.0f ms DB)%s",
+        labels[0], labels[1], status_code, elapsed * 1000, stats.statements, stats.db_seconds * 1000, queries,
+    )
+
+
+def render_prometheus() -> str:
+    """Semua metrics request dalam format teks Prometheus"""
+    lines = [
+        "# HELP http_requests_total Jumlah request per route & status",
+        "# TYPE http_requests_total counter",
+    ]
+    with _requests_lock:
+        totals = sorted(_requests_total.items())
+    for (method, route, status_code), count in totals:
+        lines.append(
+            f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status_code}"}} {count}'
+        )
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,30 @@
+# app/migrate.py
+"""
+Jalankan DDL schema (create_all + migrasi kolom/index + full-text) sekali, di luar proses web.
+Dipakai bersama DB_MIGRATE_ON_STARTUP=false supaya worker tidak introspeksi schema saat boot:
+
+    python -m app.migrate
+"""
+import logging
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.logging_config import setup_logging
+setup_logging()
+logger = logging.getLogger("app.migrate")
+
+from app.database import create_db_and_tables, engine
+import app.models  # noqa: F401  Daftarkan semua tabel ke SQLModel.metadata
+
+
+def main():
+    start = time.perf_counter()
+    create_db_and_tables()
+    engine.dispose()  # Jangan wariskan koneksi terbuka (dipanggil juga dari master app/server.py)
+    logger.info("Database schema up to date", extra={"schema_ms": round((time.perf_counter() - start) * 1000, 1)})
+
+
+if __name__ == "__main__":
+    main()
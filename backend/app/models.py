@@ -1,6 +1,8 @@
 from typing import Optional, List
 from datetime import datetime
+from sqlalchemy import Index, UniqueConstraint, event
 from sqlmodel import SQLModel, Field, Relationship
+from app.geo import encode_geohash
 
 # --- TABEL USER ---
 class User(SQLModel, table=True):
@@ -21,6 +23,15 @@ class User(SQLModel, table=True):
 
 # --- TABEL WASTE (LIMBAH) ---
 class Waste(SQLModel, table=True):
+    # Index komposit sesuai pola query di routes (katalog, dashboard producer, impact)
+    __table_args__ = (
+        Index("ix_waste_status_category_created_at", "status", "category", "created_at"),
+        Index("ix_waste_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_waste_producer_id_status", "producer_id", "status"),
+        Index("ix_waste_producer_id_created_at_id", "producer_id", "created_at", "id"),
+        Index("ix_waste_status_geohash", "status", "geohash"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     category: str       
@@ -32,10 +43,18 @@ class Waste(SQLModel, table=True):
     # 🔥 UPDATE: Status sekarang bisa: available, booked, completed
     status: str = Field(default="available") 
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Versi baris untuk ETag katalog/detail. Otomatis diupdate setiap UPDATE lewat ORM.
+    # Nullable supaya bisa ditambahkan ke tabel lama (baris lama pakai created_at).
+    updated_at: Optional[datetime] = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
     
     # 🔥 FITUR BARU: Koordinat untuk peta (latitude, longitude)
     latitude: Optional[float] = None
     longitude: Optional[float] = None
+    # Geohash dari (latitude, longitude) untuk pencarian "near me" (diisi otomatis, lihat bawah)
+    geohash: Optional[str] = None
 
     producer_id: Optional[int] = Field(default=None, foreign_key="user.id")
     producer: Optional[User] = Relationship(back_populates="wastes")
@@ -43,8 +62,25 @@ class Waste(SQLModel, table=True):
     transaction: Optional["Transaction"] = Relationship(back_populates="waste")
 
 
+@event.listens_for(Waste, "before_insert")
+@event.listens_for(Waste, "before_update")
+def _sync_waste_geohash(mapper, connection, target):
+    """Jaga kolom geohash selalu sesuai koordinat, di semua route (create, edit, partial booking)"""
+    if target.latitude is not None and target.longitude is not None:
+        target.geohash = encode_geohash(target.latitude, target.longitude)
+    else:
+        target.geohash = None
+
+
 # --- TABEL TRANSACTION (TRANSAKSI) ---
 class Transaction(SQLModel, table=True):
+    # Index komposit untuk my-bookings, impact/chart recycler, dan lookup per waste
+    __table_args__ = (
+        Index("ix_transaction_recycler_id_status", "recycler_id", "status"),
+        Index("ix_transaction_recycler_id_created_at_id", "recycler_id", "created_at", "id"),
+        Index("ix_transaction_waste_id_status", "waste_id", "status"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
 
     # - pending (baru booking, belum diambil)
@@ -84,4 +120,27 @@ class Transaction(SQLModel, table=True):
     waste: Optional[Waste] = Relationship(back_populates="transaction")
 
     recycler_id: int = Field(foreign_key="user.id")
-    recycler: Optional[User] = Relationship(back_populates="transactions")
\ No newline at end of file
+    recycler: Optional[User] = Relationship(back_populates="transactions")
+
+
+# --- TABEL IMPACT ROLLUP (REKAP DAMPAK PER USER) ---
+# Diupdate di transaksi DB yang sama dengan setiap perubahan status (lihat app/rollups.py),
+# supaya impact & chart cukup baca O(bulan) baris, bukan seluruh riwayat.
+class ImpactRollup(SQLModel, table=True):
+    __table_args__ = (
+        UniqueConstraint("user_id", "month", "category", name="uq_impactrollup_user_month_category"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    month: str  # Format 'YYYY-MM' (bulan transaksi dibuat / limbah diupload)
+    category: str
+
+    completed_weight: float = Field(default=0)
+    revenue: float = Field(default=0)
+
+    # Jumlah limbah available (hanya producer) & transaksi per status
+    available_count: int = Field(default=0)
+    pending_count: int = Field(default=0)
+    waiting_count: int = Field(default=0)
+    completed_count: int = Field(default=0)
@@ -0,0 +1,113 @@
+# app/pagination.py
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from sqlmodel import and_, or_
+
+# --- KONFIGURASI PAGINATION ---
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+# Header tempat cursor halaman berikutnya dikirim ke client
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Pilihan urutan untuk riwayat (dashboard producer, booking recycler)
+SORT_PATTERN = "^(newest|oldest)$"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Ubah posisi (created_at, id) baris terakhir jadi cursor opaque"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Kebalikan encode_cursor. Cursor rusak -> 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+
+
+def keyset_paginate(query, model, cursor: Optional[str], limit: int, descending: bool = True):
+    """
+    Keyset pagination urut terbaru dulu (created_at DESC, id DESC), atau terlama dulu kalau descending=False.
+    Tidak pakai OFFSET, jadi biaya per halaman tetap walau tabel membesar.
+    Ambil limit + 1 baris supaya tahu masih ada halaman berikutnya.
+    """
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        if descending:
+            query = query.where(
+                or_(
+                    model.created_at < cursor_created_at,
+                    and_(model.created_at == cursor_created_at, model.id < cursor_id),
+                )
+            )
+        else:
+            query = query.where(
+                or_(
+                    model.created_at > cursor_created_at,
+                    and_(model.created_at == cursor_created_at, model.id > cursor_id),
+                )
+            )
+    if descending:
+        return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    return query.order_by(model.created_at.asc(), model.id.asc()).limit(limit + 1)
+
+
+def split_page(rows, limit: int):
+    """Pisahkan baris hasil keyset_paginate jadi (items, next_cursor)"""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    items = rows[:limit]
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
+
+
+def encode_score_cursor(score: float, row_id: int) -> str:
+    """Cursor untuk hasil yang diurutkan berdasarkan skor (mis. relevansi search)"""
+    raw = f"{score!r}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_score_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        score, row_id = raw.rsplit("|", 1)
+        return float(score), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+
+
+def score_paginate(query, model, score, cursor: Optional[str], limit: int):
+    """
+    Sama seperti keyset_paginate, tapi urut (score DESC, id DESC).
+    Query harus select (model, score) supaya split_scored_page bisa membuat cursor.
+    """
+    if cursor:
+        cursor_score, cursor_id = decode_score_cursor(cursor)
+        query = query.where(
+            or_(
+                score < cursor_score,
+                and_(score == cursor_score, model.id < cursor_id),
+            )
+        )
+    return query.order_by(score.desc(), model.id.desc()).limit(limit + 1)
+
+
+def split_scored_page(rows, limit: int):
+    """Pisahkan baris (item, score) hasil score_paginate jadi (items, next_cursor)"""
+    rows = list(rows)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_item, last_score = rows[-1]
+        next_cursor = encode_score_cursor(float(last_score), last_item.id)
+    return [item for item, _ in rows], next_cursor
@@ -0,0 +1,213 @@
+# app/rollups.py
+import logging
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select, func
+from app.models import ImpactRollup, Transaction, Waste
+
+logger = logging.getLogger("app.rollups")
+
+# Status transaksi -> kolom counter di ImpactRollup
+STATUS_COUNTERS = {
+    "pending": "pending_count",
+    "waiting_confirmation": "waiting_count",
+    "completed": "completed_count",
+}
+
+ROLLUP_FIELDS = (
+    "completed_weight", "revenue",
+    "available_count", "pending_count", "waiting_count", "completed_count",
+)
+
+
+def _month_key(dt) -> str:
+    return dt.strftime('%Y-%m')
+
+
+def _bump(session: Session, user_id: int, month: str, category: str, deltas: Dict[str, float]):
+    """Tambah/kurangi counter satu baris rollup (upsert atomik di PostgreSQL & SQLite)"""
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas or user_id is None:
+        return
+
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = pg_insert if dialect == "postgresql" else sqlite_insert
+        values = {field: 0 for field in ROLLUP_FIELDS}
+        values.update(deltas)
+        stmt = insert(ImpactRollup).values(user_id=user_id, month=month, category=category, **values)
+        columns = ImpactRollup.__table__.c
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "month", "category"],
+            set_={field: columns[field] + stmt.excluded[field] for field in deltas},
+        )
+        session.execute(stmt)
+        return
+
+    # Dialect lain: select lalu update biasa
+    row = session.exec(select(ImpactRollup).where(
+        ImpactRollup.user_id == user_id,
+        ImpactRollup.month == month,
+        ImpactRollup.category == category,
+    )).first()
+    if row is None:
+        row = ImpactRollup(user_id=user_id, month=month, category=category)
+    for field, value in deltas.items():
+        setattr(row, field, getattr(row, field) + value)
+    session.add(row)
+
+
+# --- HOOK PERUBAHAN STATUS (dipanggil dari routes sebelum commit) ---
+
+def waste_status_changed(session: Session, waste: Waste, old_status: Optional[str], new_status: Optional[str]):
+    """
+    Catat perubahan status limbah. old_status None = limbah baru, new_status None = dihapus.
+    Hanya jumlah limbah 'available' milik producer yang direkap dari sisi Waste.
+    """
+    delta = int(new_status == "available") - int(old_status == "available")
+    _bump(session, waste.producer_id, _month_key(waste.created_at), waste.category or "",
+          {"available_count": delta})
+
+
+def transaction_status_changed(
+    session: Session,
+    transaction: Transaction,
+    waste: Waste,
+    old_status: Optional[str],
+    new_status: Optional[str],
+):
+    """
+    Catat perubahan status transaksi untuk producer (pemilik limbah) dan recycler.
+    old_status None = transaksi baru, new_status None = dikeluarkan dari rollup.
+    """
+    month = _month_key(transaction.created_at)
+    category = waste.category or ""
+
+    deltas = defaultdict(int)
+    if old_status in STATUS_COUNTERS:
+        deltas[STATUS_COUNTERS[old_status]] -= 1
+    if new_status in STATUS_COUNTERS:
+        deltas[STATUS_COUNTERS[new_status]] += 1
+
+    # Berat & revenue hanya dihitung saat masuk/keluar status completed
+    sign = int(new_status == "completed") - int(old_status == "completed")
+    weight = float(waste.weight or 0) * sign
+    revenue = float(waste.price * waste.weight if waste.price else 0) * sign
+
+    _bump(session, transaction.recycler_id, month, category, {**deltas, "completed_weight": weight})
+    _bump(session, waste.producer_id, month, category,
+          {**deltas, "completed_weight": weight, "revenue": revenue})
+
+
+def waste_details_changing(session: Session, waste: Waste, transactions, sign: int):
+    """
+    Kategori / berat / harga limbah diedit: panggil dengan sign=-1 SEBELUM nilai diubah
+    (keluarkan dari bucket lama), lalu sign=1 SESUDAH diubah (masukkan ke bucket baru).
+    Berlaku untuk hitungan available dan transaksi yang sudah ada (completed ikut berat & revenue).
+    """
+    old, new = (waste.status, None) if sign < 0 else (None, waste.status)
+    waste_status_changed(session, waste, old, new)
+    for transaction in transactions:
+        old, new = (transaction.status, None) if sign < 0 else (None, transaction.status)
+        transaction_status_changed(session, transaction, waste, old, new)
+
+
+# --- BACA ROLLUP ---
+
+def impact_totals(session: Session, user_id: int) -> Tuple[float, int, int, int, int]:
+    """(total_berat_completed, available, pending, waiting, completed) untuk satu user"""
+    query = select(
+        func.sum(ImpactRollup.completed_weight),
+        func.sum(ImpactRollup.available_count),
+        func.sum(ImpactRollup.pending_count),
+        func.sum(ImpactRollup.waiting_count),
+        func.sum(ImpactRollup.completed_count),
+    ).where(ImpactRollup.user_id == user_id)
+    weight, available, pending, waiting, completed = session.exec(query).first()
+    return float(weight or 0), available or 0, pending or 0, waiting or 0, completed or 0
+
+
+def monthly_totals(session: Session, user_id: int, since_month: str) -> Dict[str, Tuple[float, float]]:
+    """{month_key: (total_berat, total_revenue)} mulai since_month ('YYYY-MM')"""
+    query = select(
+        ImpactRollup.month,
+        func.sum(ImpactRollup.completed_weight),
+        func.sum(ImpactRollup.revenue),
+    ).where(
+        ImpactRollup.user_id == user_id,
+        ImpactRollup.month >= since_month,
+    ).group_by(ImpactRollup.month)
+    return {
+        month: (float(weight or 0), float(revenue or 0))
+        for month, weight, revenue in session.exec(query).all()
+    }
+
+
+def category_totals(session: Session, user_id: int) -> Dict[str, float]:
+    """Total berat completed per kategori (seluruh riwayat)"""
+    query = select(
+        ImpactRollup.category,
+        func.sum(ImpactRollup.completed_weight),
+    ).where(
+        ImpactRollup.user_id == user_id,
+        ImpactRollup.category != "",
+    ).group_by(ImpactRollup.category).having(func.sum(ImpactRollup.completed_count) > 0)
+    return {category: float(weight or 0) for category, weight in session.exec(query).all()}
+
+
+# --- REBUILD / BACKFILL ---
+
+def rebuild_rollups(session: Session) -> int:
+    """
+    Hitung ulang seluruh rollup dari tabel Waste & Transaction (untuk backfill / perbaiki drift).
+    Tidak commit, caller yang commit. Return jumlah baris rollup yang ditulis.
+    """
+    totals = defaultdict(lambda: defaultdict(float))
+
+    txn_query = select(
+        Transaction.created_at, Transaction.status, Transaction.recycler_id,
+        Waste.producer_id, Waste.category, Waste.weight, Waste.price,
+    ).join(Waste, Transaction.waste_id == Waste.id).execution_options(yield_per=1000)
+
+    for created_at, status, recycler_id, producer_id, category, weight, price in session.exec(txn_query):
+        if status not in STATUS_COUNTERS:
+            continue
+        month = _month_key(created_at)
+        for user_id in (recycler_id, producer_id):
+            row = totals[(user_id, month, category or "")]
+            row[STATUS_COUNTERS[status]] += 1
+            if status == "completed":
+                row["completed_weight"] += float(weight or 0)
+                if user_id == producer_id:
+                    row["revenue"] += float(price * weight if price else 0)
+
+    waste_query = select(Waste.producer_id, Waste.created_at, Waste.category).where(
+        Waste.status == "available"
+    ).execution_options(yield_per=1000)
+
+    for producer_id, created_at, category in session.exec(waste_query):
+        totals[(producer_id, _month_key(created_at), category or "")]["available_count"] += 1
+
+    session.execute(delete(ImpactRollup))
+    for (user_id, month, category), values in totals.items():
+        if user_id is None:
+            continue
+        counters = {field: int(value) if field.endswith("_count") else value for field, value in values.items()}
+        session.add(ImpactRollup(user_id=user_id, month=month, category=category, **counters))
+    return len(totals)
+
+
+if __name__ == "__main__":
+    # Jalankan: python -m app.rollups
+    from app.database import engine
+    from app.logging_config import setup_logging
+
+    setup_logging()
+
+    with Session(engine) as session:
+        written = rebuild_rollups(session)
+        session.commit()
+    logger.info("Rebuilt impact rollup rows", extra={"rows": written})
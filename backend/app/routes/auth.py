@@ -1,27 +1,31 @@
 # app/routes/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from sqlmodel import Session, select
 from app.database import get_session
 from app.models import User
 from app.schemas import UserCreate, UserRead, Token
-from app.auth import get_password_hash, verify_password, create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.auth import get_password_hash_async, verify_password_async, create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
 from datetime import timedelta
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+# Route auth dibuat async: bcrypt jalan di executor khusus (app/hashing.py),
+# query DB yang singkat tetap lewat threadpool supaya event loop tidak ter-block.
+
 # 1. REGISTER USER BARU
 @router.post("/register", response_model=UserRead)
-def register_user(user: UserCreate, session: Session = Depends(get_session)):
+async def register_user(user: UserCreate, session: Session = Depends(get_session)):
     # Cek apakah email sudah ada?
     statement = select(User).where(User.email == user.email)
-    existing_user = session.exec(statement).first()
+    existing_user = await run_in_threadpool(lambda: session.exec(statement).first())
     
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Hash Password sebelum simpan ke DB
-    hashed_pwd = get_password_hash(user.password)
+    hashed_pwd = await get_password_hash_async(user.password)
     
     # Buat Object User Baru
     new_user = User(
@@ -34,24 +38,26 @@ def register_user(user: UserCreate, session: Session = Depends(get_session)):
         bank_account=user.bank_account # Simpan no rek
     )
     
-    session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
-    
+    def save():
+        session.add(new_user)
+        session.commit()
+        session.refresh(new_user)
+
+    await run_in_threadpool(save)
     return new_user
 
 # 2. LOGIN (DAPAT TOKEN)
 @router.post("/login", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), 
     session: Session = Depends(get_session)
 ):
     # Cari user berdasarkan email (form_data.username diisi email)
     statement = select(User).where(User.email == form_data.username)
-    user = session.exec(statement).first()
+    user = await run_in_threadpool(lambda: session.exec(statement).first())
     
     # Validasi User & Password
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not user or not await verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -1,56 +1,110 @@
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import joinedload
+from sqlmodel import Session, select, update, func
 from app.database import get_session
 from app.models import Transaction, Waste, User
-from app.schemas import TransactionRead, TransactionCreate, PaymentSubmit
+from app.schemas import (
+    TransactionRead, TransactionCreate, PaymentSubmit,
+    BatchBookingCreate, BatchBookingItemResult, BatchBookingRead,
+)
 from app.auth import get_current_user
+from app.clusters import invalidate_clusters
+from app.catalog_cache import invalidate_catalog, waste_snapshot
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, SORT_PATTERN, keyset_paginate, split_page
+from app.impact import build_trend_data
+from app.rollups import category_totals, impact_totals, transaction_status_changed, waste_status_changed
 
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
 
-# 1. BOOKING / AMBIL LIMBAH (Khusus Recycler)
-# Mendukung partial booking - jika tidak mengambil semua, sisa tetap di marketplace
-@router.post("/book/{waste_id}", response_model=TransactionRead)
-def book_waste(
-    waste_id: int,
-    booking_data: TransactionCreate,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
-):
-    if current_user.role != "recycler":
-        raise HTTPException(status_code=403, detail="Hanya Pengolah Limbah yang boleh mengambil")
+# Berapa kali booking dicoba ulang kalau stok berubah (dibooking recycler lain) di tengah proses
+BOOKING_RETRIES = 3
+MAX_BATCH_BOOKING = 50
+BATCH_MODES = ("all_or_nothing", "best_effort")
 
-    waste = session.get(Waste, waste_id)
-    if not waste:
-        raise HTTPException(status_code=404, detail="Limbah tidak ditemukan")
-    if waste.status != "available":
-        raise HTTPException(status_code=400, detail="Limbah sudah diambil orang lain")
 
-    # Validasi jumlah yang diambil
-    estimated_qty = booking_data.estimated_quantity or waste.weight
-    if estimated_qty <= 0:
-        raise HTTPException(status_code=400, detail="Jumlah yang diambil harus lebih dari 0")
-    if estimated_qty > waste.weight:
-        raise HTTPException(status_code=400, detail=f"Jumlah yang diambil ({estimated_qty} Kg) melebihi stok ({waste.weight} Kg)")
-
-    # Cek apakah ini partial booking atau full booking
-    is_partial = estimated_qty < waste.weight
-
-    if is_partial:
-        # PARTIAL BOOKING: Kurangi stok, buat waste baru untuk yang di-booking
-        remaining_weight = waste.weight - estimated_qty
+def _claim_stock(session: Session, waste: Waste, new_values: dict) -> bool:
+    """
+    Compare-and-set: UPDATE hanya berhasil kalau status, berat & harga masih sama dengan yang dibaca.
+    Dua recycler yang booking bersamaan tidak bisa sama-sama lolos (tidak ada oversell),
+    baik di PostgreSQL (row lock saat UPDATE) maupun SQLite (write lock database).
+    """
+    result = session.execute(
+        update(Waste)
+        .where(
+            Waste.id == waste.id,
+            Waste.status == "available",
+            Waste.weight == waste.weight,
+            Waste.price == waste.price,
+        )
+        .values(**new_values, updated_at=datetime.utcnow())
+    )
+    return result.rowcount == 1
 
-        # Hitung harga per Kg untuk proporsional
-        price_per_kg = waste.price / waste.weight if waste.weight > 0 else 0
-        remaining_price = remaining_weight * price_per_kg
-        booked_price = estimated_qty * price_per_kg
 
-        # Update waste original dengan sisa stok (tetap available)
-        waste.weight = remaining_weight
-        waste.price = remaining_price
-        session.add(waste)
+def _advance_status(session: Session, transaction: Transaction, new_status: str, **values) -> str:
+    """
+    Compare-and-set status transaksi (pola sama dengan _claim_stock): UPDATE hanya berhasil kalau status
+    masih sama dengan yang dibaca. Klik ganda / request bersamaan -> yang kalah dapat 409, jadi delta
+    rollup tidak pernah diterapkan dua kali. Return status lama (untuk transaction_status_changed).
+    """
+    old_status = transaction.status
+    result = session.execute(
+        update(Transaction)
+        .where(Transaction.id == transaction.id, Transaction.status == old_status)
+        .values(status=new_status, **values)
+    )
+    if result.rowcount != 1:
+        raise HTTPException(status_code=409, detail="Transaksi sudah diproses permintaan lain, silakan muat ulang")
+    return old_status
+
+
+def _reserve_waste(session: Session, waste_id: int, booking_data: TransactionCreate, recycler_id: int):
+    """
+    Logika booking (partial / full) tanpa commit.
+    Return (transaction, geohash limbah, snapshot limbah sebelum & sesudah booking untuk invalidasi catalog cache).
+    Error validasi dilempar sebagai HTTPException.
+    """
+    for _ in range(BOOKING_RETRIES):
+        waste = session.get(Waste, waste_id, populate_existing=True)
+        if not waste:
+            raise HTTPException(status_code=404, detail="Limbah tidak ditemukan")
+        if waste.status != "available":
+            raise HTTPException(status_code=400, detail="Limbah sudah diambil orang lain")
+
+        # Validasi jumlah yang diambil
+        estimated_qty = booking_data.estimated_quantity or waste.weight
+        if estimated_qty <= 0:
+            raise HTTPException(status_code=400, detail="Jumlah yang diambil harus lebih dari 0")
+        if estimated_qty > waste.weight:
+            raise HTTPException(status_code=400, detail=f"Jumlah yang diambil ({estimated_qty} Kg) melebihi stok ({waste.weight} Kg)")
+
+        # Cek apakah ini partial booking atau full booking
+        is_partial = estimated_qty < waste.weight
+
+        if is_partial:
+            # PARTIAL BOOKING: Kurangi stok, buat waste baru untuk yang di-booking
+            remaining_weight = waste.weight - estimated_qty
+
+            # Hitung harga per Kg untuk proporsional
+            price_per_kg = waste.price / waste.weight if waste.weight > 0 else 0
+            remaining_price = remaining_weight * price_per_kg
+            booked_price = estimated_qty * price_per_kg
+
+            # Update waste original dengan sisa stok (tetap available)
+            new_values = {"weight": remaining_weight, "price": remaining_price}
+        else:
+            # FULL BOOKING: Ambil semua, waste jadi booked
+            new_values = {"status": "booked"}
+
+        before = waste_snapshot(waste)
+        if _claim_stock(session, waste, new_values):
+            break
+    else:
+        raise HTTPException(status_code=409, detail="Limbah sedang dibooking pengguna lain, silakan coba lagi")
 
+    if is_partial:
         # Buat waste baru untuk yang di-booking
         booked_waste = Waste(
             title=f"{waste.title} (Booking)",
@@ -66,50 +120,107 @@ def book_waste(
         )
         session.add(booked_waste)
         session.flush()  # Get the new waste ID
-
-        # Buat transaksi untuk waste yang di-booking
-        transaction = Transaction(
-            waste_id=booked_waste.id,
-            recycler_id=current_user.id,
-            status="pending",
-            pickup_date=booking_data.pickup_date,
-            pickup_time=booking_data.pickup_time,
-            estimated_quantity=estimated_qty,
-            transport_method=booking_data.transport_method,
-            contact_person=booking_data.contact_person,
-            contact_phone=booking_data.contact_phone,
-            pickup_address=booking_data.pickup_address,
-            notes=booking_data.notes,
-            delivery_latitude=booking_data.delivery_latitude,
-            delivery_longitude=booking_data.delivery_longitude
-        )
     else:
-        # FULL BOOKING: Ambil semua, waste jadi booked
-        waste.status = "booked"
-        session.add(waste)
-
-        # Buat transaksi untuk waste ini
-        transaction = Transaction(
-            waste_id=waste_id,
-            recycler_id=current_user.id,
-            status="pending",
-            pickup_date=booking_data.pickup_date,
-            pickup_time=booking_data.pickup_time,
-            estimated_quantity=estimated_qty,
-            transport_method=booking_data.transport_method,
-            contact_person=booking_data.contact_person,
-            contact_phone=booking_data.contact_phone,
-            pickup_address=booking_data.pickup_address,
-            notes=booking_data.notes,
-            delivery_latitude=booking_data.delivery_latitude,
-            delivery_longitude=booking_data.delivery_longitude
-        )
-
+        waste_status_changed(session, waste, "available", "booked")
+        booked_waste = waste
+
+    # Buat transaksi untuk waste yang di-booking
+    transaction = Transaction(
+        waste_id=booked_waste.id,
+        recycler_id=recycler_id,
+        status="pending",
+        pickup_date=booking_data.pickup_date,
+        pickup_time=booking_data.pickup_time,
+        estimated_quantity=estimated_qty,
+        transport_method=booking_data.transport_method,
+        contact_person=booking_data.contact_person,
+        contact_phone=booking_data.contact_phone,
+        pickup_address=booking_data.pickup_address,
+        notes=booking_data.notes,
+        delivery_latitude=booking_data.delivery_latitude,
+        delivery_longitude=booking_data.delivery_longitude
+    )
     session.add(transaction)
+    transaction_status_changed(session, transaction, booked_waste, None, "pending")
+    return transaction, waste.geohash, (before, before._replace(**new_values))
+
+
+# 1. BOOKING / AMBIL LIMBAH (Khusus Recycler)
+# Mendukung partial booking - jika tidak mengambil semua, sisa tetap di marketplace
+@router.post("/book/{waste_id}", response_model=TransactionRead)
+def book_waste(
+    waste_id: int,
+    booking_data: TransactionCreate,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "recycler":
+        raise HTTPException(status_code=403, detail="Hanya Pengolah Limbah yang boleh mengambil")
+
+    transaction, geohash, snapshots = _reserve_waste(session, waste_id, booking_data, current_user.id)
     session.commit()
     session.refresh(transaction)
+    invalidate_clusters(geohash)
+    invalidate_catalog(*snapshots)
     return transaction
 
+# 1b. 🔥 BATCH BOOKING - banyak limbah sekaligus dalam satu transaksi DB (satu commit)
+# mode=all_or_nothing: kalau ada item gagal, semua dibatalkan (HTTP 409)
+# mode=best_effort: item yang valid tetap dibooking, yang gagal dilaporkan per item
+@router.post("/book-batch", response_model=BatchBookingRead)
+def book_waste_batch(
+    batch: BatchBookingCreate,
+    response: Response,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "recycler":
+        raise HTTPException(status_code=403, detail="Hanya Pengolah Limbah yang boleh mengambil")
+    if batch.mode not in BATCH_MODES:
+        raise HTTPException(status_code=400, detail="Mode harus all_or_nothing atau best_effort")
+    if not batch.items:
+        raise HTTPException(status_code=400, detail="Daftar limbah kosong")
+    if len(batch.items) > MAX_BATCH_BOOKING:
+        raise HTTPException(status_code=400, detail=f"Maksimal {MAX_BATCH_BOOKING} limbah per batch")
+
+    results = []
+    geohashes = []
+    snapshots = []
+    for item in batch.items:
+        # Item yang gagal tidak meninggalkan perubahan: semua validasi terjadi sebelum ada write,
+        # jadi tidak perlu SAVEPOINT per item
+        try:
+            transaction, geohash, item_snapshots = _reserve_waste(session, item.waste_id, item, current_user.id)
+        except HTTPException as e:
+            results.append(BatchBookingItemResult(
+                waste_id=item.waste_id, success=False, status_code=e.status_code, detail=e.detail
+            ))
+            continue
+        session.flush()
+        geohashes.append(geohash)
+        snapshots.extend(item_snapshots)
+        results.append(BatchBookingItemResult(
+            waste_id=item.waste_id, success=True, status_code=200,
+            transaction=TransactionRead.model_validate(transaction),
+        ))
+
+    failed = sum(1 for result in results if not result.success)
+    if failed and batch.mode == "all_or_nothing":
+        session.rollback()
+        for result in results:
+            if result.success:
+                result.success = False
+                result.status_code = 409
+                result.detail = "Dibatalkan karena ada limbah lain yang gagal dibooking"
+                result.transaction = None
+        response.status_code = 409
+        return BatchBookingRead(mode=batch.mode, booked=0, failed=len(results), results=results)
+
+    session.commit()
+    invalidate_clusters(*geohashes)
+    invalidate_catalog(*snapshots)
+    return BatchBookingRead(mode=batch.mode, booked=len(results) - failed, failed=failed, results=results)
+
 # 2. 🔥 RECYCLER KLAIM SUDAH AMBIL BARANG (Step 1 of 2)
 @router.patch("/{transaction_id}/claim-received", response_model=TransactionRead)
 def recycler_claim_received(
@@ -133,13 +244,14 @@ def recycler_claim_received(
     # Pastikan status masih pending
     if transaction.status != "pending":
         raise HTTPException(
-            status_code=400, 
+            status_code=409,
             detail=f"Transaksi dengan status '{transaction.status}' tidak bisa diklaim"
         )
 
-    # Update status ke waiting_confirmation
-    transaction.status = "waiting_confirmation"
-    session.add(transaction)
+    # Update status ke waiting_confirmation (rekap impact hanya kalau UPDATE ini yang menang)
+    old_status = _advance_status(session, transaction, "waiting_confirmation")
+    waste = session.get(Waste, transaction.waste_id)
+    transaction_status_changed(session, transaction, waste, old_status, "waiting_confirmation")
     session.commit()
     session.refresh(transaction)
     
@@ -172,21 +284,25 @@ def producer_confirm_handover(
     # Pastikan status sedang waiting_confirmation
     if transaction.status != "waiting_confirmation":
         raise HTTPException(
-            status_code=400,
+            status_code=409,
             detail=f"Transaksi dengan status '{transaction.status}' tidak bisa dikonfirmasi. Status harus 'waiting_confirmation'"
         )
 
-    # Update status ke completed
-    transaction.status = "completed"
-    transaction.completed_at = datetime.utcnow()
-    session.add(transaction)
+    # Update status ke completed (rekap impact ikut diupdate di transaksi DB yang sama,
+    # hanya kalau UPDATE ini yang menang)
+    old_status = _advance_status(session, transaction, "completed", completed_at=datetime.utcnow())
+    session.refresh(waste)  # Dibaca ulang setelah transaksi terkunci
+    transaction_status_changed(session, transaction, waste, old_status, "completed")
+    waste_status_changed(session, waste, waste.status, "completed")
 
     # Update status waste juga
+    before = waste_snapshot(waste)
     waste.status = "completed"
     session.add(waste)
 
     session.commit()
     session.refresh(transaction)
+    invalidate_catalog(before)  # Status di detail limbah berubah
     return transaction
 
 # 4. 🔥 CANCEL BOOKING - FITUR BARU!
@@ -216,19 +332,28 @@ def cancel_booking(
     if not (is_recycler or is_producer):
         raise HTTPException(status_code=403, detail="Anda tidak berhak membatalkan transaksi ini")
 
-    # Tidak boleh cancel jika sudah completed
+    # Tidak boleh cancel jika sudah completed / sudah dibatalkan
     if transaction.status == "completed":
-        raise HTTPException(status_code=400, detail="Transaksi yang sudah selesai tidak bisa dibatalkan")
+        raise HTTPException(status_code=409, detail="Transaksi yang sudah selesai tidak bisa dibatalkan")
+    if transaction.status == "cancelled":
+        raise HTTPException(status_code=409, detail="Transaksi sudah dibatalkan")
 
-    # Update status
-    transaction.status = "cancelled"
-    session.add(transaction)
+    # Update status (rekap impact hanya kalau UPDATE ini yang menang)
+    old_status = _advance_status(session, transaction, "cancelled")
+    session.refresh(waste)  # Dibaca ulang setelah transaksi terkunci
+    transaction_status_changed(session, transaction, waste, old_status, "cancelled")
 
     # Kembalikan waste ke status available
+    waste_status_changed(session, waste, waste.status, "available")
+    before = waste_snapshot(waste)
     waste.status = "available"
     session.add(waste)
 
+    geohash = waste.geohash
+    after = waste_snapshot(waste)
     session.commit()
+    invalidate_clusters(geohash)
+    invalidate_catalog(before, after)
 
     return {
         "message": "Booking berhasil dibatalkan",
@@ -244,20 +369,25 @@ def get_transaction_by_waste(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    waste = session.get(Waste, waste_id)
-    if not waste:
+    # Limbah + transaksi + recycler dalam satu query (outer join, recycler di-eager load)
+    query = (
+        select(Waste, Transaction)
+        .outerjoin(Transaction, Transaction.waste_id == Waste.id)
+        .where(Waste.id == waste_id)
+        .options(joinedload(Transaction.recycler))
+    )
+    row = session.exec(query).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Limbah tidak ditemukan")
+    waste, transaction = row
 
     if waste.producer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Bukan limbah Anda")
 
-    query = select(Transaction).where(Transaction.waste_id == waste_id)
-    transaction = session.exec(query).first()
-
     if not transaction:
         return None
 
-    recycler = session.get(User, transaction.recycler_id)
+    recycler = transaction.recycler
 
     return {
         "transaction": transaction,
@@ -270,8 +400,14 @@ def get_transaction_by_waste(
     }
 
 # 6. 🔥 GET MY TRANSACTIONS (untuk Recycler)
+# Paginated (cursor di header X-Next-Cursor), filter ?status=pending&status=completed, sort newest/oldest
 @router.get("/my-bookings", response_model=List[TransactionRead])
 def get_my_bookings(
+    response: Response,
+    status_filter: Optional[List[str]] = Query(default=None, alias="status"),
+    sort: str = Query(default="newest", pattern=SORT_PATTERN),
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -280,85 +416,56 @@ def get_my_bookings(
     """
     if current_user.role != "recycler":
         raise HTTPException(status_code=403, detail="Hanya recycler yang bisa akses endpoint ini")
-    
-    query = select(Transaction).where(Transaction.recycler_id == current_user.id)
-    transactions = session.exec(query).all()
+
+    # Eager load waste supaya serialisasi TransactionRead.waste tidak query per baris (N+1)
+    query = (
+        select(Transaction)
+        .where(Transaction.recycler_id == current_user.id)
+        .options(joinedload(Transaction.waste))
+    )
+    if status_filter:
+        query = query.where(Transaction.status.in_(status_filter))
+
+    query = keyset_paginate(query, Transaction, cursor, limit, descending=sort == "newest")
+    transactions, next_cursor = split_page(session.exec(query).all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return transactions
 
+# 6. GET MY TRANSACTIONS - RINGKASAN (jumlah per status tanpa memuat baris)
+@router.get("/my-bookings/summary")
+def get_my_bookings_summary(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "recycler":
+        raise HTTPException(status_code=403, detail="Hanya recycler yang bisa akses endpoint ini")
+
+    query = select(Transaction.status, func.count(Transaction.id)).where(
+        Transaction.recycler_id == current_user.id
+    ).group_by(Transaction.status)
+    by_status = dict(session.exec(query).all())
+    return {"total": sum(by_status.values()), "by_status": by_status}
+
 # 7. IMPACT DASHBOARD API (Real-time Metrics)
 @router.get("/impact/me")
 def get_my_impact(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    total_weight = 0.0
-
-    if current_user.role == "producer":
-        # Total berat limbah yang sudah completed
-        query = select(func.sum(Waste.weight)).where(
-            Waste.producer_id == current_user.id,
-            Waste.status == "completed"
-        )
-        result = session.exec(query).first()
-        total_weight = result if result else 0.0
-
-        # Hitung jumlah limbah berdasarkan status
-        available_query = select(func.count(Waste.id)).where(
-            Waste.producer_id == current_user.id,
-            Waste.status == "available"
-        )
-        available_wastes = session.exec(available_query).first() or 0
-
-        # Hitung transaksi berdasarkan status (dari limbah producer)
-        pending_query = select(func.count(Transaction.id)).join(Waste).where(
-            Waste.producer_id == current_user.id,
-            Transaction.status == "pending"
-        )
-        pending_transactions = session.exec(pending_query).first() or 0
-
-        waiting_query = select(func.count(Transaction.id)).join(Waste).where(
-            Waste.producer_id == current_user.id,
-            Transaction.status == "waiting_confirmation"
-        )
-        processing_transactions = session.exec(waiting_query).first() or 0
-
-        completed_query = select(func.count(Transaction.id)).join(Waste).where(
-            Waste.producer_id == current_user.id,
-            Transaction.status == "completed"
-        )
-        completed_transactions = session.exec(completed_query).first() or 0
-
-    elif current_user.role == "recycler":
-        # Total berat limbah yang sudah di-recycle (completed)
-        query = select(func.sum(Waste.weight)).join(Transaction).where(
-            Transaction.recycler_id == current_user.id,
-            Transaction.status == "completed"
-        )
-        result = session.exec(query).first()
-        total_weight = result if result else 0.0
-
-        # Untuk recycler tidak ada available wastes
+    # Dibaca dari ImpactRollup (O(bulan x kategori) baris, bukan seluruh riwayat)
+    (
+        total_weight,
+        available_wastes,
+        pending_transactions,
+        processing_transactions,
+        completed_transactions,
+    ) = impact_totals(session, current_user.id)
+
+    # Untuk recycler tidak ada available wastes
+    if current_user.role != "producer":
         available_wastes = 0
 
-        # Hitung booking berdasarkan status
-        pending_query = select(func.count(Transaction.id)).where(
-            Transaction.recycler_id == current_user.id,
-            Transaction.status == "pending"
-        )
-        pending_transactions = session.exec(pending_query).first() or 0
-
-        processing_query = select(func.count(Transaction.id)).where(
-            Transaction.recycler_id == current_user.id,
-            Transaction.status == "waiting_confirmation"
-        )
-        processing_transactions = session.exec(processing_query).first() or 0
-
-        completed_query = select(func.count(Transaction.id)).where(
-            Transaction.recycler_id == current_user.id,
-            Transaction.status == "completed"
-        )
-        completed_transactions = session.exec(completed_query).first() or 0
-
     # Rumus Dampak: 1 Kg sampah = 0.5 Kg CO2 dicegah
     co2_saved = total_weight * 0.5
 
@@ -381,76 +488,9 @@ def get_chart_data(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    from datetime import datetime, timedelta
-    from collections import defaultdict
-
-    # Get last 6 months
-    today = datetime.now()
-    months_data = []
-
-    for i in range(5, -1, -1):  # 5 months ago to current
-        target_date = today - timedelta(days=30 * i)
-        month_name = target_date.strftime('%b')
-        month_key = target_date.strftime('%Y-%m')
-        months_data.append({
-            'month': month_name,
-            'month_key': month_key,
-            'limbah': 0.0,
-            'co2': 0.0,
-            'revenue': 0.0,
-            'trees': 0.0
-        })
-
-    # Category distribution
-    category_stats = defaultdict(float)
-
-    if current_user.role == "producer":
-        # Get completed transactions for producer's wastes
-        query = select(Transaction, Waste).join(Waste).where(
-            Waste.producer_id == current_user.id,
-            Transaction.status == "completed"
-        )
-        results = session.exec(query).all()
-
-        for transaction, waste in results:
-            # Aggregate by month
-            if transaction.created_at:
-                tx_month_key = transaction.created_at.strftime('%Y-%m')
-                for m in months_data:
-                    if m['month_key'] == tx_month_key:
-                        m['limbah'] += float(waste.weight or 0)
-                        m['revenue'] += float(waste.price * waste.weight if waste.price else 0)
-                        m['co2'] += float(waste.weight or 0) * 0.5
-                        m['trees'] += round((waste.weight or 0) * 0.5 / 21, 1)
-
-            # Category distribution
-            if waste.category:
-                category_stats[waste.category] += float(waste.weight or 0)
-
-    elif current_user.role == "recycler":
-        # Get completed transactions for recycler
-        query = select(Transaction, Waste).join(Waste).where(
-            Transaction.recycler_id == current_user.id,
-            Transaction.status == "completed"
-        )
-        results = session.exec(query).all()
-
-        for transaction, waste in results:
-            # Aggregate by month
-            if transaction.created_at:
-                tx_month_key = transaction.created_at.strftime('%Y-%m')
-                for m in months_data:
-                    if m['month_key'] == tx_month_key:
-                        m['limbah'] += float(waste.weight or 0)
-                        m['co2'] += float(waste.weight or 0) * 0.5
-                        m['trees'] += round((waste.weight or 0) * 0.5 / 21, 1)
-
-            # Category distribution
-            if waste.category:
-                category_stats[waste.category] += float(waste.weight or 0)
-
-    # Clean up months_data (remove month_key)
-    trend_data = [{'month': m['month'], 'limbah': round(m['limbah'], 2), 'co2': round(m['co2'], 2), 'revenue': round(m['revenue'], 0), 'trees': round(m['trees'], 1)} for m in months_data]
+    # Dibaca dari ImpactRollup yang diupdate setiap perubahan status (lihat app/rollups.py)
+    trend_data = build_trend_data(session, current_user, today=datetime.now())
+    category_stats = category_totals(session, current_user.id)
 
     # Format category data with colors
     category_colors = {
@@ -578,17 +618,17 @@ def get_payment_details(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    transaction = session.get(Transaction, transaction_id)
+    # Transaksi -> limbah -> producer dalam satu query
+    query = (
+        select(Transaction)
+        .where(Transaction.id == transaction_id)
+        .options(joinedload(Transaction.waste).joinedload(Waste.producer))
+    )
+    transaction = session.exec(query).first()
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaksi tidak ditemukan")
-    
-    waste = transaction.waste
-    if not waste:
-        waste = session.get(Waste, transaction.waste_id)
-    
-    producer = waste.producer
-    if not producer:
-        producer = session.get(User, waste.producer_id)
+
+    producer = transaction.waste.producer
     
     return {
         "bank_name": producer.bank_name,
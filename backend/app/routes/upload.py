@@ -1,18 +1,115 @@
 # app/routes/upload.py
-from fastapi import APIRouter, File, UploadFile, HTTPException
+from fastapi import APIRouter, File, Request, UploadFile, HTTPException
+from fastapi.responses import FileResponse
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
 from pathlib import Path
-import shutil
+from typing import Tuple
+import hashlib
+import re
 import uuid
-from datetime import datetime
-
-router = APIRouter(prefix="/upload", tags=["Upload"])
+from app.http_cache import is_not_modified, not_modified, upload_cache_control
+from app.images import IMAGE_VARIANTS, MAX_IMAGE_PIXELS, ImageTooLarge, ensure_variant, generate_variants
 
 # Directory untuk menyimpan file upload
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# File setengah jadi ditulis di sini dulu. Di LUAR uploads/ (yang di-mount publik di /uploads),
+# tapi bersebelahan supaya tetap satu filesystem dan rename tetap atomik.
+UPLOAD_TMP_DIR = Path(".upload_tmp")
+UPLOAD_TMP_DIR.mkdir(exist_ok=True)
+
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+CHUNK_SIZE = 64 * 1024  # Salin per 64KB, file tidak pernah dimuat utuh ke RAM
+# Boundary, header part & field lain di body multipart selain isi file
+MULTIPART_OVERHEAD = 16 * 1024
+FILE_TOO_LARGE = "Ukuran file terlalu besar. Maksimal 5MB"
+
+# Nama file ASLI yang boleh diminta variannya: "ab/<sha256>.ext" (content_path) atau
+# "20250101_120000_1a2b3c4d.ext" (upload lama). Varian (_thumb.webp dll) & file .part tidak cocok.
+_EXTENSIONS = "|".join(sorted(ext.lstrip(".") for ext in ALLOWED_EXTENSIONS))
+ORIGINAL_NAME = re.compile(
+    rf"^(?:(?P<prefix>[0-9a-f]{{2}})/(?P=prefix)[0-9a-f]{{62}}|\d{{8}}_\d{{6}}_[0-9a-f]{{8}})\.(?:{_EXTENSIONS})$"
+)
+
+
+class UploadSizeLimitRoute(APIRoute):
+    """
+    Tolak request yang Content-Length-nya sudah pasti melebihi batas, SEBELUM body dibaca.
+    FastAPI mem-parse form (dan Starlette men-spool seluruh file ke disk) sebelum handler dipanggil,
+    jadi tanpa cek ini upload 1GB tetap diterima utuh dulu baru ditolak.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request):
+            content_length = request.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > MAX_FILE_SIZE + MULTIPART_OVERHEAD:
+                raise HTTPException(status_code=413, detail=FILE_TOO_LARGE)
+            return await handler(request)
+
+        return limited_handler
+
+
+router = APIRouter(prefix="/upload", tags=["Upload"], route_class=UploadSizeLimitRoute)
+
+
+def content_path(digest: str, file_ext: str) -> Path:
+    """
+    Lokasi file berdasarkan hash isi (content-addressed): uploads/ab/abcdef...png
+    File dengan isi sama selalu punya nama sama, jadi aman di-cache selamanya
+    dan folder uploads tidak jadi satu folder datar yang besar.
+    """
+    return Path(digest[:2]) / f"{digest}{file_ext}"
+
+
+async def save_upload_stream(file: UploadFile, file_ext: str) -> Tuple[Path, int, bool]:
+    """
+    Salin file dari spool Starlette ke storage per chunk sambil menghitung sha256.
+    Saat fungsi ini jalan, body sudah diterima utuh (Starlette men-spool file > 1MB ke disk);
+    batas ukuran di sini hanya cek akhir untuk request tanpa Content-Length (chunked).
+    Request dengan Content-Length kebesaran sudah ditolak UploadSizeLimitRoute.
+    Tulis ke file .part dulu lalu rename, supaya file setengah jadi tidak pernah ter-serve.
+    Operasi disk dijalankan di threadpool agar event loop tidak ter-block.
+    Return (path relatif terhadap UPLOAD_DIR, ukuran, True jika file dengan isi sama sudah ada).
+    """
+    tmp_path = UPLOAD_TMP_DIR / f"{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    out = await run_in_threadpool(open, tmp_path, "wb")
+    try:
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > MAX_FILE_SIZE:
+                raise HTTPException(status_code=413, detail=FILE_TOO_LARGE)
+            digest.update(chunk)
+            await run_in_threadpool(out.write, chunk)
+    except BaseException:
+        await run_in_threadpool(out.close)
+        await run_in_threadpool(tmp_path.unlink, True)
+        raise
+    await run_in_threadpool(out.close)
+
+    relative_path = content_path(digest.hexdigest(), file_ext)
+    final_path = UPLOAD_DIR / relative_path
+
+    def move_into_place() -> bool:
+        final_path.parent.mkdir(exist_ok=True)
+        if final_path.exists():
+            # Duplikat: isi sudah tersimpan, buang salinan baru
+            tmp_path.unlink()
+            return True
+        tmp_path.replace(final_path)
+        return False
+
+    duplicate = await run_in_threadpool(move_into_place)
+    return relative_path, size, duplicate
 
 @router.post("/image")
 async def upload_image(file: UploadFile = File(...)):
@@ -27,34 +124,72 @@ async def upload_image(file: UploadFile = File(...)):
             detail=f"Format file tidak didukung. Gunakan: {', '.join(ALLOWED_EXTENSIONS)}"
         )
 
-    # Validasi ukuran file
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail="Ukuran file terlalu besar. Maksimal 5MB"
-        )
-
-    # Generate unique filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    unique_id = str(uuid.uuid4())[:8]
-    filename = f"{timestamp}_{unique_id}{file_ext}"
-    file_path = UPLOAD_DIR / filename
-
-    # Save file
+    # Save file (streaming + validasi ukuran file sambil jalan, nama file = hash isi)
     try:
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        relative_path, size, duplicate = await save_upload_stream(file, file_ext)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Gagal menyimpan file: {str(e)}"
         )
 
+    # Buat varian ukuran (thumb/card/full) di threadpool, kosong jika bukan gambar / tanpa Pillow.
+    # Untuk duplikat, varian yang sudah ada tidak dibuat ulang.
+    try:
+        variants = await run_in_threadpool(generate_variants, UPLOAD_DIR / relative_path)
+    except ImageTooLarge:
+        # File baru dibuang; duplikat tetap disimpan karena sudah dipakai upload sebelumnya
+        if not duplicate:
+            await run_in_threadpool((UPLOAD_DIR / relative_path).unlink, True)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Resolusi gambar terlalu besar. Maksimal {MAX_IMAGE_PIXELS // 1_000_000} megapiksel"
+        )
+
     # Return URL
+    filename = relative_path.as_posix()
     file_url = f"/uploads/{filename}"
     return {
         "filename": filename,
         "url": file_url,
-        "size": len(contents)
+        "size": size,
+        "duplicate": duplicate,
+        "variants": {
+            name: f"/uploads/{path.relative_to(UPLOAD_DIR).as_posix()}"
+            for name, path in variants.items()
+        }
     }
+
+@router.get("/image/{filename:path}")
+async def get_image_variant(filename: str, request: Request, variant: str = "full"):
+    """
+    Ambil gambar upload dalam ukuran tertentu (thumb, card, full).
+    Untuk file lama yang belum punya varian, varian dibuat saat pertama diminta.
+    Kalau varian tidak bisa dibuat, file asli yang dikirim.
+    """
+    if variant not in IMAGE_VARIANTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Varian tidak dikenal. Gunakan: {', '.join(IMAGE_VARIANTS)}"
+        )
+
+    # Hanya file asli (bukan varian, file staging, atau path lain di bawah uploads/)
+    if not ORIGINAL_NAME.fullmatch(filename):
+        raise HTTPException(status_code=404, detail="Gambar tidak ditemukan")
+
+    # Cegah path traversal lewat symlink: file harus tetap berada di dalam UPLOAD_DIR
+    upload_root = UPLOAD_DIR.resolve()
+    original = (UPLOAD_DIR / filename).resolve()
+    if upload_root not in original.parents or not original.is_file():
+        raise HTTPException(status_code=404, detail="Gambar tidak ditemukan")
+
+    path = await run_in_threadpool(ensure_variant, original, variant) or original
+    stat_result = await run_in_threadpool(path.stat)
+    response = FileResponse(path, stat_result=stat_result)
+    response.headers["Cache-Control"] = upload_cache_control(original.name)
+
+    if is_not_modified(request, response.headers["etag"]):
+        return not_modified(response.headers["etag"], response.headers["Cache-Control"])
+    return response
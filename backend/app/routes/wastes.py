@@ -1,10 +1,26 @@
+import logging
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlmodel import Session, select, func, and_, or_
 from app.database import get_session
 from app.models import Waste, User, Transaction
-from app.schemas import WasteCreate, WasteRead, WasteUpdate
+from app.schemas import WasteCreate, WasteRead, WasteUpdate, WasteNearbyRead
+from app.clusters import get_clusters, invalidate_clusters
+from app.catalog_cache import (
+    cached_response, catalog_cache, detail_cache_key, invalidate_catalog, json_body, page_cache_key, waste_snapshot,
+)
+from app.geo import bbox_around, cover_bbox, haversine_km, prefix_upper_bound
 from app.auth import get_current_user
+from app.rollups import waste_details_changing, waste_status_changed
+from app.http_cache import PRICE_RECOMMENDATION, make_etag
+from app.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, SORT_PATTERN,
+    keyset_paginate, score_paginate, split_page, split_scored_page,
+)
+from app.search import relevance_search, search_terms
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/wastes", tags=["Wastes"])
 
@@ -23,47 +39,277 @@ def create_waste(
     new_waste.status = "available"
     
     session.add(new_waste)
+    waste_status_changed(session, new_waste, None, "available")
     session.commit()
     session.refresh(new_waste)
+    invalidate_clusters(new_waste.geohash)
+    invalidate_catalog(waste_snapshot(new_waste))
     return new_waste
 
+def catalog_filters(
+    category: Optional[str] = None,
+    min_price: Optional[float] = Query(default=None, ge=0),
+    max_price: Optional[float] = Query(default=None, ge=0),
+    min_weight: Optional[float] = Query(default=None, ge=0),
+    max_weight: Optional[float] = Query(default=None, ge=0),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> list:
+    """Dependency: query params katalog -> daftar kondisi WHERE (dipakai route sync & async)"""
+    filters = [Waste.status == "available"]
+
+    if category:
+        filters.append(Waste.category == category)
+    if min_price is not None:
+        filters.append(Waste.price >= min_price)
+    if max_price is not None:
+        filters.append(Waste.price <= max_price)
+    if min_weight is not None:
+        filters.append(Waste.weight >= min_weight)
+    if max_weight is not None:
+        filters.append(Waste.weight <= max_weight)
+    if created_after:
+        filters.append(Waste.created_at >= created_after)
+    if created_before:
+        filters.append(Waste.created_at < created_before)
+    return filters
+
+def search_page_query(dialect: str, q: str, category: Optional[str], sort: str, cursor: Optional[str], limit: int):
+    """Query satu halaman hasil pencarian. Return (query, scored): scored=True -> baris (Waste, skor)"""
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Kata kunci pencarian tidak valid")
+
+    match, score, fts_table = relevance_search(dialect, terms)
+    filters = [Waste.status == "available", match]
+    if category:
+        filters.append(Waste.category == category)
+
+    if sort == "newest":
+        query = select(Waste)
+    else:
+        query = select(Waste, score)
+    if fts_table is not None:
+        query = query.join(fts_table, fts_table.c.rowid == Waste.id)
+    query = query.where(*filters)
+
+    if sort == "newest":
+        return keyset_paginate(query, Waste, cursor, limit), False
+    return score_paginate(query, Waste, score, cursor, limit), True
+
+def catalog_page_entry(results: list, next_cursor: Optional[str]) -> dict:
+    """Entry catalog cache untuk satu halaman katalog (dipakai route sync & async). ETag = hash isi halaman."""
+    body = json_body([WasteRead.model_validate(waste).model_dump(mode="json") for waste in results])
+    return {"etag": make_etag(next_cursor, body), "next_cursor": next_cursor, "body": body}
+
+def waste_detail_entry(waste: Waste) -> dict:
+    """Entry catalog cache untuk detail limbah (dipakai route sync & async)"""
+    etag = make_etag(waste.id, waste.updated_at or waste.created_at)
+    return {"etag": etag, "body": json_body(WasteRead.model_validate(waste).model_dump(mode="json"))}
+
 # 2. LIHAT SEMUA LIMBAH (Katalog Marketplace)
+# Pagination pakai cursor (keyset), cursor halaman berikutnya ada di header X-Next-Cursor.
+# ETag dihitung dari isi halaman yang diambil (bukan COUNT/MAX seluruh hasil filter, yang O(N) per request),
+# browser yang kirim If-None-Match tetap dapat 304 tanpa body.
+# Halaman yang sudah pernah diminta disajikan dari catalog cache (app/catalog_cache.py) tanpa query sama sekali.
 @router.get("/", response_model=List[WasteRead])
 def read_wastes(
-    category: Optional[str] = None,
+    request: Request,
+    filters: list = Depends(catalog_filters),
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     session: Session = Depends(get_session)
 ):
-    query = select(Waste).where(Waste.status == "available")
+    cache_key = page_cache_key(request)
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return cached_response(request, cached)
+    generation = catalog_cache.generation()
 
-    if category:
-        query = query.where(Waste.category == category)
+    query = keyset_paginate(select(Waste).where(*filters), Waste, cursor, limit)
+    results, next_cursor = split_page(session.exec(query).all(), limit)
 
-    results = session.exec(query).all()
-    return results
+    entry = catalog_page_entry(results, next_cursor)
+    catalog_cache.set(cache_key, entry, generation)
+    return cached_response(request, entry)
 
 # 3. LIHAT LIMBAH SAYA (Dashboard Producer)
+# Paginated (cursor di header X-Next-Cursor), filter ?status=available&status=booked, sort newest/oldest
 @router.get("/me", response_model=List[WasteRead])
 def read_my_wastes(
+    response: Response,
+    status_filter: Optional[List[str]] = Query(default=None, alias="status"),
+    category: Optional[str] = None,
+    sort: str = Query(default="newest", pattern=SORT_PATTERN),
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "producer":
         raise HTTPException(status_code=403, detail="Anda bukan Producer")
-        
+
     query = select(Waste).where(Waste.producer_id == current_user.id)
-    results = session.exec(query).all()
+    if status_filter:
+        query = query.where(Waste.status.in_(status_filter))
+    if category:
+        query = query.where(Waste.category == category)
+
+    query = keyset_paginate(query, Waste, cursor, limit, descending=sort == "newest")
+    results, next_cursor = split_page(session.exec(query).all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return results
+
+# 3. LIHAT LIMBAH SAYA - RINGKASAN (jumlah per status tanpa memuat baris)
+@router.get("/me/summary")
+def read_my_wastes_summary(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "producer":
+        raise HTTPException(status_code=403, detail="Anda bukan Producer")
+
+    query = select(Waste.status, func.count(Waste.id), func.sum(Waste.weight)).where(
+        Waste.producer_id == current_user.id
+    ).group_by(Waste.status)
+    by_status = {
+        waste_status: {"count": count, "weight": float(weight or 0)}
+        for waste_status, count, weight in session.exec(query).all()
+    }
+    return {
+        "total": sum(item["count"] for item in by_status.values()),
+        "by_status": by_status,
+    }
+
+# 3a. 🔥 PENCARIAN KATA KUNCI (judul & deskripsi) - harus sebelum /{waste_id}
+# PostgreSQL: tsvector + GIN, SQLite: FTS5. Setiap kata dicocokkan sebagai prefix.
+# sort=relevance (default) atau newest, pagination cursor sama seperti katalog.
+@router.get("/search", response_model=List[WasteRead])
+def search_wastes(
+    response: Response,
+    q: str = Query(min_length=1, max_length=200),
+    category: Optional[str] = None,
+    sort: str = Query(default="relevance", pattern="^(relevance|newest)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: Session = Depends(get_session)
+):
+    query, scored = search_page_query(session.get_bind().dialect.name, q, category, sort, cursor, limit)
+    rows = session.exec(query).all()
+    results, next_cursor = split_scored_page(rows, limit) if scored else split_page(rows, limit)
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return results
 
+# 3b. 🔥 CARI LIMBAH TERDEKAT (Near Me) - harus sebelum /{waste_id}
+@router.get("/nearby", response_model=List[WasteNearbyRead])
+def read_nearby_wastes(
+    lat: Optional[float] = Query(default=None, ge=-90, le=90),
+    lon: Optional[float] = Query(default=None, ge=-180, le=180),
+    radius_km: float = Query(default=10, gt=0, le=200),
+    min_lat: Optional[float] = Query(default=None, ge=-90, le=90),
+    min_lon: Optional[float] = Query(default=None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(default=None, ge=-90, le=90),
+    max_lon: Optional[float] = Query(default=None, ge=-180, le=180),
+    category: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: Session = Depends(get_session)
+):
+    """
+    Limbah available di sekitar titik (lat, lon, radius_km) atau di dalam bounding box
+    (min_lat, min_lon, max_lat, max_lon), urut dari yang terdekat.
+    Kandidat diambil lewat range scan index (status, geohash) pada sel-sel geohash
+    yang menutupi area, jadi tidak perlu membaca seluruh katalog.
+    """
+    bbox = (min_lat, min_lon, max_lat, max_lon)
+    use_bbox = all(value is not None for value in bbox)
+    if not use_bbox and any(value is not None for value in bbox):
+        raise HTTPException(status_code=400, detail="Bounding box harus lengkap: min_lat, min_lon, max_lat, max_lon")
+    if use_bbox:
+        if min_lat > max_lat or min_lon > max_lon:
+            raise HTTPException(status_code=400, detail="Bounding box tidak valid")
+        # Jarak dihitung dari titik (lat, lon) kalau ada, kalau tidak dari tengah box
+        if lat is None or lon is None:
+            lat, lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+    elif lat is None or lon is None:
+        raise HTTPException(status_code=400, detail="Isi lat & lon, atau bounding box")
+    else:
+        bbox = bbox_around(lat, lon, radius_km)
+
+    cells = cover_bbox(*bbox)
+    query = select(Waste).where(
+        Waste.status == "available",
+        or_(*[
+            and_(Waste.geohash >= cell, Waste.geohash < prefix_upper_bound(cell))
+            for cell in cells
+        ]),
+    )
+    if category:
+        query = query.where(Waste.category == category)
+
+    # Saring presisi: sel geohash lebih besar dari area yang diminta
+    results = []
+    for waste in session.exec(query).all():
+        if use_bbox:
+            if not (bbox[0] <= waste.latitude <= bbox[2] and bbox[1] <= waste.longitude <= bbox[3]):
+                continue
+        distance = haversine_km(lat, lon, waste.latitude, waste.longitude)
+        if not use_bbox and distance > radius_km:
+            continue
+        results.append(WasteNearbyRead(**waste.model_dump(), distance_km=round(distance, 3)))
+
+    results.sort(key=lambda item: item.distance_km)
+    return results[:limit]
+
+# 3c. 🔥 CLUSTER PIN PETA (per zoom & viewport) - harus sebelum /{waste_id}
+@router.get("/clusters")
+def read_waste_clusters(
+    zoom: int = Query(ge=0, le=22),
+    min_lat: float = Query(ge=-90, le=90),
+    min_lon: float = Query(ge=-180, le=180),
+    max_lat: float = Query(ge=-90, le=90),
+    max_lon: float = Query(ge=-180, le=180),
+    category: Optional[str] = None,
+    session: Session = Depends(get_session)
+):
+    """
+    Agregat limbah available per sel geohash (jumlah, total berat, kategori dominan)
+    supaya peta tidak perlu menerima ribuan pin satu per satu.
+    Hasil di-cache per tile dan dihapus saat limbah dibuat, diedit, dibooking, atau dihapus.
+    """
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="Viewport tidak valid")
+
+    precision, clusters = get_clusters(session, zoom, (min_lat, min_lon, max_lat, max_lon), category)
+    return {
+        "zoom": zoom,
+        "precision": precision,
+        "total_wastes": sum(cluster["count"] for cluster in clusters),
+        "clusters": clusters,
+    }
+
 # 4. 🔥 GET DETAIL LIMBAH BY ID
 @router.get("/{waste_id}", response_model=WasteRead)
 def get_waste_detail(
     waste_id: int,
+    request: Request,
     session: Session = Depends(get_session)
 ):
+    cache_key = detail_cache_key(waste_id)
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return cached_response(request, cached)
+    generation = catalog_cache.generation()
+
     waste = session.get(Waste, waste_id)
     if not waste:
         raise HTTPException(status_code=404, detail="Limbah tidak ditemukan")
-    return waste
+
+    entry = waste_detail_entry(waste)
+    catalog_cache.set(cache_key, entry, generation)
+    return cached_response(request, entry)
 
 # 5. 🔥 UPDATE LIMBAH (EDIT)
 @router.put("/{waste_id}", response_model=WasteRead)
@@ -100,14 +346,27 @@ def update_waste(
     
     # Update fields yang dikirim (partial update)
     update_data = waste_update.dict(exclude_unset=True)
-    print(f"🔍 Updating waste {waste_id} with data: {update_data}")
+    logger.debug("Updating waste %s", waste_id, extra={"fields": sorted(update_data)})
 
+    old_geohash = waste.geohash
+    before = waste_snapshot(waste)
+    # Rekap impact dikelompokkan per kategori & memakai berat/harga: pindahkan kontribusi limbah ini
+    rollup_changed = any(
+        field in ("category", "weight", "price") and value != getattr(waste, field)
+        for field, value in update_data.items()
+    )
+    if rollup_changed:
+        waste_details_changing(session, waste, transactions, -1)
     for field, value in update_data.items():
         setattr(waste, field, value)
+    if rollup_changed:
+        waste_details_changing(session, waste, transactions, 1)
 
     session.add(waste)
     session.commit()
     session.refresh(waste)
+    invalidate_clusters(old_geohash, waste.geohash)
+    invalidate_catalog(before, waste_snapshot(waste))
     return waste
 
 # 6. 🔥 DELETE LIMBAH - PERBAIKAN BUG FK CONSTRAINT!
@@ -151,8 +410,13 @@ def delete_waste(
         if txn.status == "cancelled":
             session.delete(txn)
     
+    waste_status_changed(session, waste, waste.status, None)
+    geohash = waste.geohash
+    before = waste_snapshot(waste)
     session.delete(waste)
     session.commit()
+    invalidate_clusters(geohash)
+    invalidate_catalog(before)
     
     return {
         "message": "Limbah berhasil dihapus",
@@ -163,11 +427,14 @@ def delete_waste(
 @router.get("/recommend/price")
 def get_price_recommendation(
     category: str,
-    weight: float
+    weight: float,
+    response: Response
 ):
     """
     Smart Price Recommendation berdasarkan kategori dan berat.
+    Hasil hanya bergantung pada input, jadi boleh di-cache publik (browser/CDN).
     """
+    response.headers["Cache-Control"] = PRICE_RECOMMENDATION
     # Database harga pasar rata-rata per Kg (dalam Rupiah)
     price_per_kg = {
         "Minyak": 0,  # Minyak jelantah biasanya gratis atau sangat murah
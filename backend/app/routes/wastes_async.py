@@ -0,0 +1,83 @@
+# app/routes/wastes_async.py
+# Versi async route baca katalog (dipasang hanya kalau DB_ASYNC=true, lihat main.py).
+# Route dengan path yang sama di app/routes/wastes.py tertutup karena router ini didaftarkan lebih dulu.
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_async_session
+from app.models import Waste
+from app.schemas import WasteRead
+from app.catalog_cache import cached_response, catalog_cache, detail_cache_key, page_cache_key
+from app.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER,
+    keyset_paginate, split_page, split_scored_page,
+)
+from app.routes.wastes import (
+    catalog_filters, catalog_page_entry, search_page_query, waste_detail_entry,
+)
+
+router = APIRouter(prefix="/wastes", tags=["Wastes"])
+
+# 2. LIHAT SEMUA LIMBAH (Katalog Marketplace) - async
+@router.get("/", response_model=List[WasteRead])
+async def read_wastes(
+    request: Request,
+    filters: list = Depends(catalog_filters),
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_async_session)
+):
+    cache_key = page_cache_key(request)
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return cached_response(request, cached)
+    generation = catalog_cache.generation()
+
+    query = keyset_paginate(select(Waste).where(*filters), Waste, cursor, limit)
+    results, next_cursor = split_page((await session.exec(query)).all(), limit)
+
+    entry = catalog_page_entry(results, next_cursor)
+    catalog_cache.set(cache_key, entry, generation)
+    return cached_response(request, entry)
+
+# 3a. PENCARIAN KATA KUNCI - async
+@router.get("/search", response_model=List[WasteRead])
+async def search_wastes(
+    response: Response,
+    q: str = Query(min_length=1, max_length=200),
+    category: Optional[str] = None,
+    sort: str = Query(default="relevance", pattern="^(relevance|newest)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_async_session)
+):
+    query, scored = search_page_query(session.bind.dialect.name, q, category, sort, cursor, limit)
+    rows = (await session.exec(query)).all()
+    results, next_cursor = split_scored_page(rows, limit) if scored else split_page(rows, limit)
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return results
+
+# 4. GET DETAIL LIMBAH BY ID - async
+# Pakai convertor :int supaya /wastes/me, /wastes/nearby, dst tetap jatuh ke router sync
+@router.get("/{waste_id:int}", response_model=WasteRead)
+async def get_waste_detail(
+    waste_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    cache_key = detail_cache_key(waste_id)
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return cached_response(request, cached)
+    generation = catalog_cache.generation()
+
+    waste = await session.get(Waste, waste_id)
+    if not waste:
+        raise HTTPException(status_code=404, detail="Limbah tidak ditemukan")
+
+    entry = waste_detail_entry(waste)
+    catalog_cache.set(cache_key, entry, generation)
+    return cached_response(request, entry)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from sqlmodel import SQLModel
 
@@ -61,6 +61,9 @@ class WasteRead(WasteBase):
     producer_id: int
     created_at: datetime
 
+class WasteNearbyRead(WasteRead):
+    distance_km: float
+
 # =======================
 # 3. SCHEMAS TRANSACTION
 # =======================
@@ -108,6 +111,25 @@ class TransactionRead(SQLModel):
     waste: Optional[WasteRead] = None
 
 
+class BatchBookingCreate(SQLModel):
+    items: List[TransactionCreate]
+    # all_or_nothing: satu gagal = semua batal, best_effort: yang valid tetap dibooking
+    mode: str = "all_or_nothing"
+
+class BatchBookingItemResult(SQLModel):
+    waste_id: int
+    success: bool
+    status_code: int
+    detail: Optional[str] = None
+    transaction: Optional[TransactionRead] = None
+
+class BatchBookingRead(SQLModel):
+    mode: str
+    booked: int
+    failed: int
+    results: List[BatchBookingItemResult]
+
+
 class PaymentSubmit(SQLModel):
     payment_method: str  # cash, transfer, qris
     payment_proof_url: str
@@ -0,0 +1,84 @@
+# app/search.py
+import re
+from typing import List
+from sqlalchemy import Float, cast, column, literal, literal_column, table, text
+from sqlmodel import func, and_, or_
+from app.models import Waste
+
+# Konfigurasi 'simple': tanpa stemming bahasa tertentu, cocok untuk teks Bahasa Indonesia
+PG_TS_CONFIG = "simple"
+PG_DOCUMENT_SQL = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+# Tabel virtual FTS5 (SQLite) dengan external content = tabel waste, disinkronkan lewat trigger
+waste_fts = table("waste_fts", column("rowid"))
+
+SQLITE_FTS_SETUP = [
+    """CREATE VIRTUAL TABLE waste_fts USING fts5(
+        title, description, content='waste', content_rowid='id'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS waste_fts_ai AFTER INSERT ON waste BEGIN
+        INSERT INTO waste_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS waste_fts_ad AFTER DELETE ON waste BEGIN
+        INSERT INTO waste_fts(waste_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS waste_fts_au AFTER UPDATE OF title, description ON waste BEGIN
+        INSERT INTO waste_fts(waste_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO waste_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    # Isi index dari data yang sudah ada
+    "INSERT INTO waste_fts(waste_fts) VALUES ('rebuild')",
+]
+
+
+def setup_fulltext(engine):
+    """
+    Siapkan index full-text sesuai dialect. Aman dipanggil berulang.
+    - PostgreSQL: GIN index atas ekspresi tsvector(title + description)
+    - SQLite: tabel virtual FTS5 + trigger sinkronisasi
+    """
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        if dialect == "postgresql":
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_waste_search ON waste USING GIN ({PG_DOCUMENT_SQL})"
+            ))
+        elif dialect == "sqlite":
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'waste_fts'"
+            )).first()
+            if not exists:
+                for statement in SQLITE_FTS_SETUP:
+                    conn.execute(text(statement))
+
+
+def search_terms(keywords: str) -> List[str]:
+    """Pecah input user jadi token alfanumerik (buang operator/tanda baca)"""
+    return re.findall(r"\w+", keywords.lower())
+
+
+def relevance_search(dialect: str, terms: List[str]):
+    """
+    Return (kondisi WHERE, ekspresi skor, join target atau None).
+    Skor makin besar = makin relevan. Semua token dicocokkan sebagai prefix (botol -> botolan).
+    """
+    if dialect == "postgresql":
+        document = literal_column(PG_DOCUMENT_SQL)
+        query = func.to_tsquery(PG_TS_CONFIG, " & ".join(f"{term}:*" for term in terms))
+        # ts_rank -> real; cast ke double supaya nilai di cursor round-trip tanpa pembulatan
+        return document.op("@@")(query), cast(func.ts_rank(document, query), Float), None
+
+    if dialect == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        fts = literal_column("waste_fts")
+        # bm25: makin kecil makin relevan, dibalik supaya arah urutan sama dengan PostgreSQL
+        return fts.op("MATCH")(match), -func.bm25(fts), waste_fts
+
+    # Dialect lain: tanpa index full-text, fallback ILIKE tanpa ranking
+    condition = and_(*[
+        or_(Waste.title.ilike(f"%{term}%"), Waste.description.ilike(f"%{term}%"))
+        for term in terms
+    ])
+    return condition, literal(0.0), None
@@ -0,0 +1,105 @@
+# app/server.py
+"""
+Launcher production: beberapa worker uvicorn dalam satu instance.
+
+    python -m app.server
+
+- Jumlah worker: WEB_CONCURRENCY, default jumlah CPU yang boleh dipakai proses ini,
+  dibatasi supaya tiap worker masih kebagian koneksi dari DB_MAX_CONNECTIONS.
+- Pool koneksi dibagi per worker di app/database.py (lewat WEB_CONCURRENCY yang di-set di sini).
+- uvloop & httptools dipakai kalau terpasang (uvicorn[standard]), kalau tidak asyncio & h11.
+- Reload graceful: kirim SIGHUP ke proses master, worker di-restart tanpa menutup socket.
+  SIGTERM: request yang sedang jalan diberi waktu GRACEFUL_TIMEOUT_SECONDS untuk selesai.
+"""
+import logging
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.logging_config import setup_logging
+setup_logging()
+logger = logging.getLogger("app.server")
+
+# --- KONFIGURASI SERVER ---
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+# Harus lebih lama dari idle timeout load balancer / router platform (umumnya 55-60 detik),
+# kalau tidak LB bisa mengirim request ke koneksi yang baru saja ditutup worker (502).
+KEEP_ALIVE_SECONDS = int(os.getenv("KEEP_ALIVE_SECONDS", "65"))
+GRACEFUL_TIMEOUT_SECONDS = int(os.getenv("GRACEFUL_TIMEOUT_SECONDS", "30"))
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "*")  # Di belakang proxy platform
+# Minimal koneksi per engine per worker: 1 untuk request, 1 cadangan (rollup, cancel, dll)
+MIN_CONNECTIONS_PER_WORKER = 2
+
+try:
+    import uvloop  # noqa: F401
+    LOOP = "uvloop"
+except ImportError:
+    LOOP = "asyncio"
+
+try:
+    import httptools  # noqa: F401
+    HTTP = "httptools"
+except ImportError:
+    HTTP = "h11"
+
+
+def available_cpus() -> int:
+    """CPU yang boleh dipakai proses ini (menghormati cpuset container, beda dengan os.cpu_count)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    """WEB_CONCURRENCY kalau di-set, kalau tidak jumlah CPU; dibatasi jatah koneksi DB"""
+    workers = int(os.getenv("WEB_CONCURRENCY") or available_cpus())
+    max_connections = int(os.getenv("DB_MAX_CONNECTIONS") or 0)
+    if max_connections > 0:
+        engines = 2 if os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes") else 1
+        db_limit = max_connections // (engines * MIN_CONNECTIONS_PER_WORKER)
+        if workers > db_limit:
+            logger.warning(
+                "Worker dikurangi karena jatah koneksi DB",
+                extra={"requested": workers, "workers": max(db_limit, 1), "db_max_connections": max_connections},
+            )
+            workers = db_limit
+    return max(workers, 1)
+
+
+def main():
+    import uvicorn
+
+    workers = worker_count()
+    # Dibaca app/database.py di tiap worker untuk membagi pool
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+
+    # DDL schema cukup sekali di master, bukan N worker berebut ALTER/CREATE INDEX
+    if os.getenv("DB_MIGRATE_ON_STARTUP", "true").lower() in ("1", "true", "yes"):
+        from app.migrate import main as migrate
+        migrate()
+        os.environ["DB_MIGRATE_ON_STARTUP"] = "false"
+
+    logger.info(
+        "Starting server",
+        extra={"workers": workers, "loop": LOOP, "http": HTTP, "port": PORT, "keep_alive": KEEP_ALIVE_SECONDS},
+    )
+    uvicorn.run(
+        "app.main:app",
+        host=HOST,
+        port=PORT,
+        workers=workers,
+        loop=LOOP,
+        http=HTTP,
+        timeout_keep_alive=KEEP_ALIVE_SECONDS,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT_SECONDS,
+        proxy_headers=True,
+        forwarded_allow_ips=FORWARDED_ALLOW_IPS,
+        log_config=None,  # Logging sudah dipasang app.logging_config (juga di tiap worker lewat app.main)
+    )
+
+
+if __name__ == "__main__":
+    main()
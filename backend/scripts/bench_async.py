@@ -0,0 +1,139 @@
+# scripts/bench_async.py
+"""
+Load test GET /wastes/ (katalog): throughput & latency DB_ASYNC=false (route sync di threadpool)
+dibanding DB_ASYNC=true (AsyncSession), pada concurrency tinggi.
+
+    python scripts/bench_async.py [--wastes 2000] [--requests 2000] [--concurrency 30 100]
+
+Tiap mode menjalankan uvicorn (1 worker) di port sendiri. Catalog cache dimatikan supaya
+setiap request benar-benar sampai ke DB. Default memakai database SQLite sementara (aiosqlite);
+angka yang representatif butuh Postgres: set BENCH_DATABASE_URL ke database KOSONG khusus
+benchmark (semua tabel di-drop & dibuat ulang).
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from sqlmodel import Session, SQLModel
+from app.database import create_db_and_tables, engine
+from app.models import User, Waste
+
+CATEGORIES = ["Plastik", "Kertas", "Logam"]
+PORT = 8790
+
+
+def seed(wastes: int):
+    SQLModel.metadata.drop_all(engine)
+    create_db_and_tables()
+    rng = random.Random(42)
+    with Session(engine) as session:
+        producer = User(email="p@bench", password_hash="x", name="p", role="producer", contact="1")
+        session.add(producer)
+        session.commit()
+        for index in range(wastes):
+            session.add(Waste(
+                title=f"bench {index}", category=rng.choice(CATEGORIES), weight=1.0, price=100.0,
+                status="available", producer_id=producer.id,
+            ))
+        session.commit()
+    engine.dispose()
+
+
+def start_server(port: int, async_mode: bool) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DB_ASYNC="true" if async_mode else "false",
+        DB_MIGRATE_ON_STARTUP="false",
+        CATALOG_CACHE_BACKEND="off",
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn berhenti saat startup (exit {process.returncode})")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError("uvicorn tidak siap dalam 60 detik")
+
+
+async def load(port: int, requests: int, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        errors = 0
+
+        async def one(index: int):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.get("/wastes/", params={
+                        "limit": 20, "category": CATEGORIES[index % len(CATEGORIES)],
+                    })
+                    errors += response.status_code != 200
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*[one(index) for index in range(concurrency)])  # Pemanasan pool koneksi
+        latencies.clear()
+        errors = 0
+        start = time.perf_counter()
+        await asyncio.gather(*[one(index) for index in range(requests)])
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wastes", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[30, 100])
+    args = parser.parse_args()
+
+    seed(args.wastes)
+    print(f"{engine.dialect.name}, {args.wastes} limbah, {args.requests} request per putaran")
+    for async_mode in (False, True):
+        port = PORT + async_mode
+        server = start_server(port, async_mode)
+        try:
+            for concurrency in args.concurrency:
+                result = asyncio.run(load(port, args.requests, concurrency))
+                print(f"{'async' if async_mode else 'sync':5} c={concurrency:<4} {result['rps']:7.0f} req/s  "
+                      f"p50 {result['p50']:6.0f} ms  p99 {result['p99']:6.0f} ms  error {result['errors']}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
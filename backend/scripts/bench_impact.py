@@ -0,0 +1,117 @@
+# scripts/bench_impact.py
+"""
+Benchmark GET /transactions/impact/me: jumlah round-trip SQL & latency per panggilan,
+versi lama (satu COUNT/SUM per status) dibanding versi sekarang (satu query agregat dari ImpactRollup).
+
+    python scripts/bench_impact.py [--wastes 20000] [--calls 50]
+
+Default memakai database SQLite sementara. Untuk Postgres set BENCH_DATABASE_URL
+ke database KOSONG khusus benchmark (semua tabel di-drop & dibuat ulang).
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, select, func
+from app.database import create_db_and_tables, engine
+from app.models import Transaction, User, Waste
+from app.rollups import impact_totals, rebuild_rollups
+
+
+def legacy_counters(session: Session, user: User) -> tuple:
+    """Versi sebelum optimasi: satu SELECT per angka di kartu impact"""
+    if user.role == "producer":
+        weight = session.exec(select(func.sum(Waste.weight)).where(
+            Waste.producer_id == user.id, Waste.status == "completed")).first() or 0.0
+        available = session.exec(select(func.count(Waste.id)).where(
+            Waste.producer_id == user.id, Waste.status == "available")).first() or 0
+        owner = Waste.producer_id == user.id
+        counts = [
+            session.exec(select(func.count(Transaction.id)).join(Waste).where(owner, Transaction.status == status)).first() or 0
+            for status in ("pending", "waiting_confirmation", "completed")
+        ]
+    else:
+        weight = session.exec(select(func.sum(Waste.weight)).join(Transaction).where(
+            Transaction.recycler_id == user.id, Transaction.status == "completed")).first() or 0.0
+        available = 0
+        counts = [
+            session.exec(select(func.count(Transaction.id)).where(
+                Transaction.recycler_id == user.id, Transaction.status == status)).first() or 0
+            for status in ("pending", "waiting_confirmation", "completed")
+        ]
+    return (float(weight), available, *counts)
+
+
+def current_counters(session: Session, user: User) -> tuple:
+    weight, available, pending, waiting, completed = impact_totals(session, user.id)
+    return (weight, available if user.role == "producer" else 0, pending, waiting, completed)
+
+
+def seed(wastes: int) -> tuple:
+    SQLModel.metadata.drop_all(engine)
+    create_db_and_tables()
+    rng = random.Random(42)
+    with Session(engine) as session:
+        producer = User(email="p@bench", password_hash="x", name="p", role="producer", contact="1")
+        recycler = User(email="r@bench", password_hash="x", name="r", role="recycler", contact="1")
+        session.add(producer)
+        session.add(recycler)
+        session.commit()
+        for _ in range(wastes):
+            session.add(Waste(
+                title="bench", category=rng.choice(["Plastik", "Kertas", "Logam"]), weight=1.0, price=100.0,
+                status=rng.choice(["available", "booked", "completed"]), producer_id=producer.id,
+            ))
+        session.flush()
+        for waste in session.exec(select(Waste).where(Waste.status != "available")):
+            status = "completed" if waste.status == "completed" else rng.choice(["pending", "waiting_confirmation"])
+            session.add(Transaction(waste_id=waste.id, recycler_id=recycler.id, status=status))
+        session.flush()
+        rebuild_rollups(session)
+        session.commit()
+        return producer.id, recycler.id
+
+
+def measure(session: Session, fn, user: User, calls: int) -> tuple:
+    statements = []
+    listener = lambda *args: statements.append(1)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        start = time.perf_counter()
+        for _ in range(calls):
+            result = fn(session, user)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, len(statements) / calls, elapsed / calls * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wastes", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    user_ids = seed(args.wastes)
+    print(f"{engine.dialect.name}, {args.wastes} limbah, {args.calls} panggilan per versi")
+    with Session(engine) as session:
+        for user_id in user_ids:
+            user = session.get(User, user_id)
+            old, old_statements, old_ms = measure(session, legacy_counters, user, args.calls)
+            new, new_statements, new_ms = measure(session, current_counters, user, args.calls)
+            assert old == new, f"hasil beda: {old} != {new}"
+            print(f"{user.role:9} lama: {old_statements:.0f} query {old_ms:7.2f} ms | "
+                  f"sekarang: {new_statements:.0f} query {new_ms:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# scripts/bench_startup.py
+"""
+Benchmark cold start: waktu dari spawn uvicorn sampai GET /health pertama 200,
+DB_MIGRATE_ON_STARTUP=true (DDL schema di tiap boot) dibanding false (release phase `python -m app.migrate`).
+Ikut dicetak fase startup yang dilaporkan app sendiri (/health -> "startup").
+
+    python scripts/bench_startup.py [--runs 5]
+
+Default memakai database SQLite sementara. Untuk Postgres set BENCH_DATABASE_URL
+(schema dibuat sekali sebelum pengukuran, data tidak diubah).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DATABASE_URL = os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+PORT = 8795
+PHASES = ("imports_ms", "app_setup_ms", "schema_ms", "total_ms")
+
+
+def base_env() -> dict:
+    return dict(os.environ, DATABASE_URL=DATABASE_URL, LOG_LEVEL=os.getenv("LOG_LEVEL", "WARNING"))
+
+
+def cold_start(migrate: bool) -> tuple:
+    """(ms sampai /health 200, fase startup dari app)"""
+    env = dict(base_env(), DB_MIGRATE_ON_STARTUP="true" if migrate else "false")
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn berhenti saat startup (exit {process.returncode})")
+            try:
+                response = httpx.get(f"http://127.0.0.1:{PORT}/health", timeout=0.5)
+                if response.status_code == 200:
+                    return (time.perf_counter() - start) * 1000, response.json()["startup"]
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.005)
+        raise RuntimeError("uvicorn tidak siap dalam 60 detik")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # Schema dibuat dulu (seperti release phase), supaya mode false tidak start di database kosong
+    subprocess.run([sys.executable, "-m", "app.migrate"], cwd=BACKEND_DIR, env=base_env(), check=True)
+
+    print(f"{DATABASE_URL.split(':', 1)[0]}, median dari {args.runs} cold start")
+    for migrate in (True, False):
+        results = [cold_start(migrate) for _ in range(args.runs)]
+        ready_ms = statistics.median(ms for ms, _ in results)
+        phases = "  ".join(
+            f"{phase} {statistics.median(startup.get(phase, 0) for _, startup in results):.0f}" for phase in PHASES
+        )
+        print(f"DB_MIGRATE_ON_STARTUP={str(migrate).lower():5}  siap {ready_ms:6.0f} ms  |  {phases}")
+
+
+if __name__ == "__main__":
+    main()
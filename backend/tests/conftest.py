@@ -0,0 +1,66 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Default SQLite sementara; TEST_DATABASE_URL untuk menjalankan suite di Postgres (database kosong khusus test)
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ["DB_ASYNC"] = "false"
+# Schema dibuat sekali per sesi test (fixture _schema), bukan di startup app
+os.environ["DB_MIGRATE_ON_STARTUP"] = "false"
+# Cache in-process dimatikan: id user & limbah dipakai ulang antar test
+os.environ["USER_CACHE_MAX_SIZE"] = "0"
+os.environ["CLUSTER_CACHE_MAX_SIZE"] = "0"
+os.environ["CATALOG_CACHE_BACKEND"] = "off"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
+from app.database import create_db_and_tables, engine
+from app.main import app
+
+
+@pytest.fixture(scope="session")
+def _schema():
+    SQLModel.metadata.drop_all(engine)
+    create_db_and_tables()
+
+
+@pytest.fixture
+def db(_schema):
+    """Semua tabel dikosongkan sebelum tiap test (DELETE, trigger FTS ikut membersihkan index)"""
+    with engine.begin() as conn:
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            conn.execute(table.delete())
+    return engine
+
+
+@pytest.fixture
+def session(db):
+    with Session(db) as session:
+        yield session
+
+
+@pytest.fixture
+def client(db):
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def register(client):
+    """register(email, role) -> header Authorization user baru"""
+
+    def _register(email: str, role: str) -> dict:
+        client.post("/auth/register", json={
+            "email": email, "name": email.split("@")[0], "role": role, "contact": "0812", "password": "rahasia",
+        })
+        token = client.post("/auth/login", data={"username": email, "password": "rahasia"}).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    return _register
@@ -0,0 +1,94 @@
+# tests/test_batch_booking.py
+# POST /transactions/book-batch: all_or_nothing membatalkan semua item kalau satu gagal
+# (tidak ada stok yang tertahan, rollup tidak berubah), best_effort melaporkan hasil per item.
+from sqlmodel import select
+from app.models import Transaction, Waste
+from app.rollups import rebuild_rollups
+
+
+def create_waste(client, headers, weight, price):
+    response = client.post("/wastes/", headers=headers, json={
+        "title": "Kaleng", "category": "Logam", "weight": weight, "price": price,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def book_batch(client, headers, mode, items):
+    return client.post("/transactions/book-batch", headers=headers, json={"mode": mode, "items": items})
+
+
+def assert_rollups_consistent(client, session, headers):
+    incremental = client.get("/transactions/impact/me", headers=headers).json()
+    rebuild_rollups(session)
+    session.commit()
+    assert client.get("/transactions/impact/me", headers=headers).json() == incremental
+    return incremental
+
+
+def test_all_or_nothing_failure_leaves_no_stock_claimed(client, register, session):
+    producer = register("producer@test.id", "producer")
+    recycler = register("recycler@test.id", "recycler")
+    partial_id = create_waste(client, producer, 10, 1000)
+    full_id = create_waste(client, producer, 5, 500)
+    too_small_id = create_waste(client, producer, 2, 200)
+
+    response = book_batch(client, recycler, "all_or_nothing", [
+        {"waste_id": partial_id, "estimated_quantity": 4},
+        {"waste_id": full_id},
+        {"waste_id": too_small_id, "estimated_quantity": 3},
+    ])
+
+    assert response.status_code == 409, response.text
+    body = response.json()
+    assert (body["booked"], body["failed"]) == (0, 3)
+    assert [result["status_code"] for result in body["results"]] == [409, 409, 400]
+    assert all(result["transaction"] is None for result in body["results"])
+
+    wastes = session.exec(select(Waste).order_by(Waste.id)).all()
+    assert [(waste.id, waste.weight, waste.status) for waste in wastes] == [
+        (partial_id, 10, "available"), (full_id, 5, "available"), (too_small_id, 2, "available"),
+    ]
+    assert session.exec(select(Transaction)).all() == []
+    impact = assert_rollups_consistent(client, session, producer)
+    assert impact["available_wastes"] == 3
+    assert impact["pending_transactions"] == 0
+
+
+def test_best_effort_reports_each_item(client, register, session):
+    producer = register("producer@test.id", "producer")
+    recycler = register("recycler@test.id", "recycler")
+    partial_id = create_waste(client, producer, 10, 1000)
+    full_id = create_waste(client, producer, 5, 500)
+    too_small_id = create_waste(client, producer, 2, 200)
+
+    response = book_batch(client, recycler, "best_effort", [
+        {"waste_id": partial_id, "estimated_quantity": 4},
+        {"waste_id": full_id},
+        {"waste_id": full_id},  # Sudah dibooking item sebelumnya di batch yang sama
+        {"waste_id": too_small_id, "estimated_quantity": 3},
+        {"waste_id": 999999},
+    ])
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["booked"], body["failed"]) == (2, 3)
+    results = body["results"]
+    assert [(result["waste_id"], result["success"], result["status_code"]) for result in results] == [
+        (partial_id, True, 200), (full_id, True, 200), (full_id, False, 400),
+        (too_small_id, False, 400), (999999, False, 404),
+    ]
+    assert results[0]["transaction"]["estimated_quantity"] == 4
+    assert results[1]["transaction"]["waste_id"] == full_id
+    assert all(result["transaction"] is None and result["detail"] for result in results[2:])
+
+    assert session.get(Waste, partial_id).weight == 6
+    assert session.get(Waste, full_id).status == "booked"
+    assert session.get(Waste, too_small_id).status == "available"
+    transactions = session.exec(select(Transaction)).all()
+    assert sorted(transaction.id for transaction in transactions) == sorted(
+        result["transaction"]["id"] for result in results[:2]
+    )
+    impact = assert_rollups_consistent(client, session, producer)
+    assert impact["available_wastes"] == 2
+    assert impact["pending_transactions"] == 2
@@ -0,0 +1,87 @@
+# tests/test_booking_concurrency.py
+# Banyak recycler booking limbah yang sama bersamaan: compare-and-set di _claim_stock
+# harus mencegah oversell (total dibooking <= stok awal, sisa stok tidak pernah negatif).
+# Perubahan status transaksi (_advance_status) juga compare-and-set: delta rollup hanya diterapkan sekali.
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlmodel import select
+from app.models import Transaction, Waste
+from app.rollups import rebuild_rollups
+
+THREADS = 8
+
+
+def book_concurrently(client, headers, waste_id, quantity):
+    barrier = threading.Barrier(THREADS)
+
+    def book(_):
+        barrier.wait()
+        return client.post(f"/transactions/book/{waste_id}", headers=headers, json={
+            "waste_id": waste_id, "estimated_quantity": quantity,
+        })
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        responses = list(pool.map(book, range(THREADS)))
+    assert all(response.status_code in (200, 400, 409) for response in responses), [
+        (response.status_code, response.text) for response in responses
+    ]
+    return [response for response in responses if response.status_code == 200]
+
+
+def create_waste(client, headers, weight, price):
+    response = client.post("/wastes/", headers=headers, json={
+        "title": "Botol PET", "category": "Plastik", "weight": weight, "price": price,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def test_concurrent_partial_bookings_never_oversell(client, register, session):
+    producer = register("producer@test.id", "producer")
+    recycler = register("recycler@test.id", "recycler")
+    waste_id = create_waste(client, producer, 10, 1000)
+
+    booked = book_concurrently(client, recycler, waste_id, 3)
+
+    original = session.get(Waste, waste_id)
+    booked_weight = sum(session.exec(select(Waste.weight).join(Transaction).where(Transaction.status == "pending")))
+    assert 1 <= len(booked) <= 3
+    assert original.weight >= 0
+    assert booked_weight <= 10
+    assert booked_weight + original.weight == 10
+    assert booked_weight == 3 * len(booked)
+
+
+def test_concurrent_full_bookings_have_one_winner(client, register, session):
+    producer = register("producer@test.id", "producer")
+    recycler = register("recycler@test.id", "recycler")
+    waste_id = create_waste(client, producer, 5, 500)
+
+    booked = book_concurrently(client, recycler, waste_id, None)
+
+    assert len(booked) == 1
+    assert session.get(Waste, waste_id).status == "booked"
+    assert len(session.exec(select(Transaction).where(Transaction.waste_id == waste_id)).all()) == 1
+
+
+def test_concurrent_cancels_apply_rollup_once(client, register, session):
+    producer = register("producer@test.id", "producer")
+    recycler = register("recycler@test.id", "recycler")
+    waste_id = create_waste(client, producer, 5, 500)
+    transaction_id = client.post(f"/transactions/book/{waste_id}", headers=recycler, json={"waste_id": waste_id}).json()["id"]
+    barrier = threading.Barrier(THREADS)
+
+    def cancel(_):
+        barrier.wait()
+        return client.delete(f"/transactions/{transaction_id}/cancel", headers=recycler).status_code
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        codes = list(pool.map(cancel, range(THREADS)))
+
+    assert sorted(codes) == [200] + [409] * (THREADS - 1)
+    incremental = client.get("/transactions/impact/me", headers=producer).json()
+    assert incremental["available_wastes"] == 1
+    assert incremental["pending_transactions"] == 0
+    rebuild_rollups(session)
+    session.commit()
+    assert client.get("/transactions/impact/me", headers=producer).json() == incremental
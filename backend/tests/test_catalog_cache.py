@@ -0,0 +1,179 @@
+# tests/test_catalog_cache.py
+# Catalog cache (GET /wastes/): setelah create, booking (partial & full), edit & cancel, setiap halaman
+# yang pernah di-cache - termasuk halaman setelah cursor, bukan hanya halaman pertama - harus sama
+# dengan isi DB. Backend redis ikut diuji kalau TEST_REDIS_URL di-set (server kosong khusus test).
+import os
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlmodel import select
+from app import catalog_cache as catalog_cache_module
+from app.catalog_cache import MemoryBackend, RedisBackend, WasteSnapshot, _page_may_contain, catalog_cache
+from app.models import Waste
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+LIMIT = 2
+PAGE_FILTERS = [{}, {"category": "Plastik"}, {"category": "Kertas"}, {"min_weight": 5}]
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache_backend(request, monkeypatch):
+    if request.param == "memory":
+        backend = MemoryBackend(max_size=1000, ttl_seconds=60)
+    else:
+        url = os.getenv("TEST_REDIS_URL")
+        if not url or catalog_cache_module.redis is None:
+            pytest.skip("TEST_REDIS_URL tidak di-set")
+        client = catalog_cache_module.redis.Redis.from_url(url, decode_responses=True)
+        backend = RedisBackend(client, ttl_seconds=60, prefix=f"test-catalog-{uuid.uuid4().hex}:")
+    monkeypatch.setattr(catalog_cache, "backend", backend)
+    yield backend
+    if request.param == "redis":
+        keys = list(backend.client.scan_iter(match=backend.prefix + "*"))
+        if keys:
+            backend.client.delete(*keys)
+
+
+def create_waste(client, headers, category, weight):
+    response = client.post("/wastes/", headers=headers, json={
+        "title": f"{category} {weight}kg", "category": category, "weight": weight, "price": weight * 100,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def expected_page(session, filters, cursor):
+    """Isi halaman dihitung langsung dari DB (sama dengan catalog_filters + keyset (created_at, id) DESC)"""
+    session.expire_all()
+    wastes = session.exec(select(Waste).where(Waste.status == "available")).all()
+    if "category" in filters:
+        wastes = [waste for waste in wastes if waste.category == filters["category"]]
+    if "min_weight" in filters:
+        wastes = [waste for waste in wastes if waste.weight >= filters["min_weight"]]
+    wastes.sort(key=lambda waste: (waste.created_at, waste.id), reverse=True)
+    if cursor:
+        position = decode_cursor(cursor)
+        wastes = [waste for waste in wastes if (waste.created_at, waste.id) < position]
+    return [(waste.id, waste.category, waste.weight, waste.price) for waste in wastes[:LIMIT]]
+
+
+class CatalogPages:
+    """Ingat semua (filter, cursor) yang pernah diminta, supaya halaman lama di cache ikut dicek"""
+
+    def __init__(self, client, session):
+        self.client = client
+        self.session = session
+        self.seen = []
+
+    def get(self, filters, cursor):
+        params = {**filters, "limit": LIMIT, **({"cursor": cursor} if cursor else {})}
+        response = self.client.get("/wastes/", params=params)
+        assert response.status_code == 200, response.text
+        page = [(item["id"], item["category"], item["weight"], item["price"]) for item in response.json()]
+        assert page == expected_page(self.session, filters, cursor), (filters, cursor)
+        return response.headers.get(NEXT_CURSOR_HEADER)
+
+    def walk(self):
+        """Minta ulang semua halaman yang pernah diminta, lalu telusuri cursor baru dari halaman pertama"""
+        for filters, cursor in list(self.seen):
+            self.get(filters, cursor)
+        for filters in PAGE_FILTERS:
+            cursor = self.get(filters, None)
+            while cursor:
+                if (filters, cursor) not in self.seen:
+                    self.seen.append((filters, cursor))
+                cursor = self.get(filters, cursor)
+
+
+def test_cached_pages_follow_every_write(client, register, session, cache_backend):
+    producer = register("producer@test.id", "producer")
+    recycler = register("recycler@test.id", "recycler")
+    ids = [create_waste(client, producer, "Plastik" if index % 2 else "Kertas", index + 2) for index in range(7)]
+    pages = CatalogPages(client, session)
+    pages.walk()
+    assert any(cursor for _, cursor in pages.seen)
+
+    # Tanpa write: semua halaman dari cache
+    hits = catalog_cache.hits
+    pages.walk()
+    assert catalog_cache.hits - hits >= len(pages.seen) * 2
+
+    create_waste(client, producer, "Kertas", 9)
+    pages.walk()
+
+    # Partial booking limbah paling lama (halaman terakhir): berat & harga sisa berubah
+    partial = client.post(f"/transactions/book/{ids[0]}", headers=recycler, json={
+        "waste_id": ids[0], "estimated_quantity": 1,
+    })
+    assert partial.status_code == 200, partial.text
+    pages.walk()
+
+    # Edit limbah di halaman tengah: pindah dari Kertas ke Plastik & jadi lolos filter min_weight
+    edited = client.put(f"/wastes/{ids[2]}", headers=producer, json={"category": "Plastik", "weight": 10})
+    assert edited.status_code == 200, edited.text
+    pages.walk()
+
+    full = client.post(f"/transactions/book/{ids[3]}", headers=recycler, json={"waste_id": ids[3]})
+    assert full.status_code == 200, full.text
+    pages.walk()
+
+    # Cancel: limbah hasil partial booking & limbah yang dibooking penuh kembali available
+    for transaction in (partial.json(), full.json()):
+        response = client.delete(f"/transactions/{transaction['id']}/cancel", headers=recycler)
+        assert response.status_code == 200, response.text
+        pages.walk()
+
+
+def test_detail_is_invalidated_on_edit(client, register, cache_backend):
+    producer = register("producer@test.id", "producer")
+    waste_id = create_waste(client, producer, "Plastik", 3)
+    assert client.get(f"/wastes/{waste_id}").json()["weight"] == 3
+
+    client.put(f"/wastes/{waste_id}", headers=producer, json={"weight": 4})
+
+    assert client.get(f"/wastes/{waste_id}").json()["weight"] == 4
+
+
+def test_result_of_query_started_before_invalidation_is_not_stored(cache_backend):
+    snapshot = WasteSnapshot(1, "available", "Plastik", 100.0, 1.0, datetime(2025, 1, 1))
+    generation = catalog_cache.generation()
+    catalog_cache.invalidate(snapshot)
+
+    catalog_cache.set("page:{}", {"etag": "x", "body": "[]", "next_cursor": None}, generation)
+    assert catalog_cache.get("page:{}") is None
+
+    catalog_cache.set("page:{}", {"etag": "x", "body": "[]", "next_cursor": None}, catalog_cache.generation())
+    assert catalog_cache.get("page:{}") is not None
+
+
+CREATED = datetime(2025, 3, 1, 12, 0)
+SNAPSHOT = WasteSnapshot(10, "available", "Plastik", 500.0, 5.0, CREATED)
+
+
+@pytest.mark.parametrize("params, expected", [
+    ({}, True),
+    ({"limit": "24"}, True),
+    ({"category": "Plastik"}, True),
+    ({"category": "Kertas"}, False),
+    ({"min_price": "500"}, True),
+    ({"min_price": "501"}, False),
+    ({"max_price": "499.9"}, False),
+    ({"min_weight": "5", "max_weight": "5"}, True),
+    ({"min_weight": "6"}, False),
+    ({"max_weight": "4"}, False),
+    ({"created_after": "2025-03-01T12:00:00"}, True),
+    ({"created_after": "2025-03-02"}, False),
+    ({"created_before": "2025-03-01T12:00:00"}, False),
+    ({"created_before": "2025-03-02"}, True),
+    # Halaman setelah cursor hanya berisi baris yang lebih lama dari cursor
+    ({"cursor": encode_cursor(CREATED + timedelta(seconds=1), 1)}, True),
+    ({"cursor": encode_cursor(CREATED, 11)}, True),
+    ({"cursor": encode_cursor(CREATED, 10)}, False),
+    ({"cursor": encode_cursor(CREATED - timedelta(seconds=1), 99)}, False),
+    # Param yang tidak bisa dibaca: anggap mungkin memuat (lebih baik terhapus daripada basi)
+    ({"min_price": "abc"}, True),
+    ({"created_after": "kemarin"}, True),
+    ({"cursor": "bukan-cursor"}, True),
+])
+def test_page_may_contain(params, expected):
+    assert _page_may_contain(params, SNAPSHOT) is expected
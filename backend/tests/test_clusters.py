@@ -0,0 +1,107 @@
+# tests/test_clusters.py
+# GET /wastes/clusters: di tiap zoom, limbah available dikelompokkan per prefix geohash sepanjang
+# presisi zoom itu. Jumlah, rata-rata koordinat & kategori dominan harus sama dengan hitungan manual.
+from collections import defaultdict
+import pytest
+from app.clusters import precision_for_zoom
+from app.geo import cover_bbox, encode_geohash
+
+VIEWPORT = {"min_lat": -6.4, "min_lon": 106.6, "max_lat": -6.0, "max_lon": 107.0}
+# Tiga titik berjarak ~15m (terpisah hanya di zoom tinggi) & satu titik ~7km dari yang lain
+POINTS = [
+    (-6.20000, 106.80000, "Plastik"),
+    (-6.20010, 106.80010, "Plastik"),
+    (-6.25000, 106.85000, "Kertas"),
+    (-6.20020, 106.80020, "Kertas"),
+]
+SURABAYA = (-7.25, 112.75, "Logam")  # Di luar viewport
+ALL_POINTS = POINTS + [SURABAYA]
+
+
+def create_waste(client, headers, latitude, longitude, category):
+    response = client.post("/wastes/", headers=headers, json={
+        "title": "Limbah", "category": category, "weight": 2, "price": 100,
+        "latitude": latitude, "longitude": longitude,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def expected_clusters(points, precision):
+    """{geohash: (count, mean lat, mean lon)} dihitung langsung dari koordinat"""
+    groups = defaultdict(list)
+    for lat, lon, _ in points:
+        groups[encode_geohash(lat, lon, precision)].append((lat, lon))
+    return {
+        cell: (len(members), sum(lat for lat, _ in members) / len(members), sum(lon for _, lon in members) / len(members))
+        for cell, members in groups.items()
+    }
+
+
+@pytest.fixture
+def seeded(client, register):
+    producer = register("producer@test.id", "producer")
+    ids = [create_waste(client, producer, *point) for point in ALL_POINTS]
+    return producer, ids
+
+
+def test_clusters_match_geohash_grouping_at_every_zoom(client, seeded):
+    for zoom in range(0, 23):
+        response = client.get("/wastes/clusters", params={"zoom": zoom, **VIEWPORT})
+
+        assert response.status_code == 200, response.text
+        body = response.json()
+        precision = precision_for_zoom(zoom)
+        assert body["precision"] == precision
+        # Cluster dihitung per tile (sel geohash lebih kasar yang menutupi viewport): titik di luar
+        # viewport ikut terhitung kalau masih satu tile, seperti Surabaya di tile "q" pada zoom kecil
+        tiles = tuple(cover_bbox(*VIEWPORT.values(), max_precision=max(precision - 1, 1)))
+        points = [point for point in ALL_POINTS if encode_geohash(point[0], point[1]).startswith(tiles)]
+        assert all(point in points for point in POINTS), zoom
+        expected = expected_clusters(points, precision)
+        actual = {cluster["geohash"]: cluster for cluster in body["clusters"]}
+        assert set(actual) == set(expected), zoom
+        assert body["total_wastes"] == len(points)
+        for cell, (count, lat, lon) in expected.items():
+            assert actual[cell]["count"] == count
+            assert actual[cell]["total_weight"] == 2 * count
+            assert actual[cell]["latitude"] == pytest.approx(lat)
+            assert actual[cell]["longitude"] == pytest.approx(lon)
+
+
+def test_precision_grows_with_zoom():
+    precisions = [precision_for_zoom(zoom) for zoom in range(0, 23)]
+    assert precisions == sorted(precisions)
+    # Batas zoom Leaflet: kota (~zoom 10-12) = sel ~5km, jalan (~zoom 16) = sel ~150m
+    assert {zoom: precision_for_zoom(zoom) for zoom in (0, 3, 5, 8, 10, 13, 15, 18, 22)} == {
+        0: 1, 3: 2, 5: 3, 8: 4, 10: 5, 13: 6, 15: 7, 18: 8, 22: 8,
+    }
+
+
+def test_clusters_skip_booked_wastes_and_filter_category(client, register, seeded):
+    _, ids = seeded
+    recycler = register("recycler@test.id", "recycler")
+    client.post(f"/transactions/book/{ids[0]}", headers=recycler, json={"waste_id": ids[0]})
+
+    everything = client.get("/wastes/clusters", params={"zoom": 10, **VIEWPORT}).json()
+    paper = client.get("/wastes/clusters", params={"zoom": 10, "category": "Kertas", **VIEWPORT}).json()
+
+    assert everything["total_wastes"] == len(POINTS) - 1
+    assert paper["total_wastes"] == 2
+    assert set(cluster["geohash"] for cluster in paper["clusters"]) == set(expected_clusters(
+        [point for point in POINTS if point[2] == "Kertas"], paper["precision"]
+    ))
+
+
+def test_dominant_category_breaks_ties_by_name(client, seeded):
+    # Zoom 0: satu cluster "q" berisi 2 Plastik, 2 Kertas & 1 Logam -> seri, nama terbesar menang
+    body = client.get("/wastes/clusters", params={"zoom": 0, **VIEWPORT}).json()
+
+    assert [cluster["dominant_category"] for cluster in body["clusters"]] == ["Plastik"]
+
+
+def test_invalid_viewport_is_rejected(client):
+    response = client.get("/wastes/clusters", params={
+        "zoom": 5, "min_lat": 1, "min_lon": 0, "max_lat": 0, "max_lon": 1,
+    })
+    assert response.status_code == 400
@@ -0,0 +1,123 @@
+# tests/test_impact_aggregation.py
+# Kartu impact & chart dibaca dari ImpactRollup yang diupdate per perubahan status (jalur SQL inkremental).
+# rebuild_rollups menghitung ulang dari tabel mentah di Python. Keduanya harus selalu sama.
+from app.rollups import rebuild_rollups
+
+
+def create_waste(client, headers, category, weight, price):
+    response = client.post("/wastes/", headers=headers, json={
+        "title": f"{category} {weight}kg", "category": category, "weight": weight, "price": price,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def book(client, headers, waste_id, quantity=None):
+    response = client.post(f"/transactions/book/{waste_id}", headers=headers, json={
+        "waste_id": waste_id, "estimated_quantity": quantity,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def impact_views(client, *users):
+    return [
+        (client.get("/transactions/impact/me", headers=headers).json(),
+         client.get("/transactions/impact/chart-data", headers=headers).json())
+        for headers in users
+    ]
+
+
+def assert_rollups_match_rebuild(client, session, *users):
+    incremental = impact_views(client, *users)
+    rebuild_rollups(session)
+    session.commit()
+    assert impact_views(client, *users) == incremental
+    return incremental
+
+
+def test_rollups_match_rebuild_across_booking_lifecycle(client, register, session):
+    producer = register("producer@test.id", "producer")
+    recycler = register("recycler@test.id", "recycler")
+
+    plastic = create_waste(client, producer, "Plastik", 10, 1000)
+    paper = create_waste(client, producer, "Kertas", 8, 500)
+    metal = create_waste(client, producer, "Logam", 6, 3000)
+    oil = create_waste(client, producer, "Minyak Jelantah", 5, 2000)
+    unused = create_waste(client, producer, "Kaca", 3, 100)
+
+    # Full booking sampai completed
+    completed_full = book(client, recycler, plastic)
+    client.patch(f"/transactions/{completed_full}/claim-received", headers=recycler)
+    client.patch(f"/transactions/{completed_full}/confirm-handover", headers=producer)
+
+    # Partial booking sampai completed, sisa stok tetap available
+    completed_partial = book(client, recycler, paper, quantity=3)
+    client.patch(f"/transactions/{completed_partial}/claim-received", headers=recycler)
+    client.patch(f"/transactions/{completed_partial}/confirm-handover", headers=producer)
+
+    # Dibatalkan, tetap pending, dan menunggu konfirmasi
+    client.delete(f"/transactions/{book(client, recycler, metal)}/cancel", headers=recycler)
+    book(client, recycler, metal, quantity=2)
+    client.patch(f"/transactions/{book(client, recycler, oil)}/claim-received", headers=recycler)
+
+    assert client.delete(f"/wastes/{unused}", headers=producer).status_code == 200
+
+    (producer_impact, producer_chart), (recycler_impact, _) = assert_rollups_match_rebuild(
+        client, session, producer, recycler
+    )
+    assert producer_impact["total_waste_managed_kg"] == 13
+    assert producer_impact["completed_transactions"] == 2
+    assert producer_impact["pending_transactions"] == 1
+    assert producer_impact["processing_transactions"] == 1
+    assert producer_impact["available_wastes"] == 2  # Sisa Kertas 5kg & sisa Logam 4kg
+    assert recycler_impact["available_wastes"] == 0
+    assert {item["name"]: item["value"] for item in producer_chart["category_data"]} == {"Plastik": 10, "Kertas": 3}
+    assert producer_chart["trend_data"][-1]["limbah"] == 13
+
+
+def test_rollups_follow_category_weight_and_price_edits(client, register, session):
+    producer = register("producer@test.id", "producer")
+    recycler = register("recycler@test.id", "recycler")
+
+    available = create_waste(client, producer, "Plastik", 10, 1000)
+    completed = create_waste(client, producer, "Kertas", 4, 500)
+    transaction = book(client, recycler, completed)
+    client.patch(f"/transactions/{transaction}/claim-received", headers=recycler)
+    client.patch(f"/transactions/{transaction}/confirm-handover", headers=producer)
+
+    assert client.put(f"/wastes/{available}", headers=producer, json={"category": "Logam"}).status_code == 200
+    assert client.put(f"/wastes/{completed}", headers=producer, json={
+        "category": "Tekstil", "weight": 6, "price": 700,
+    }).status_code == 200
+
+    (producer_impact, producer_chart), _ = assert_rollups_match_rebuild(client, session, producer, recycler)
+    assert producer_impact["available_wastes"] == 1
+    assert producer_impact["total_waste_managed_kg"] == 6
+    assert {item["name"]: item["value"] for item in producer_chart["category_data"]} == {"Tekstil": 6}
+    assert producer_chart["trend_data"][-1]["revenue"] == 4200
+
+
+def test_repeated_transitions_leave_rollups_unchanged(client, register, session):
+    producer = register("producer@test.id", "producer")
+    recycler = register("recycler@test.id", "recycler")
+
+    completed = book(client, recycler, create_waste(client, producer, "Plastik", 10, 1000))
+    assert client.patch(f"/transactions/{completed}/claim-received", headers=recycler).status_code == 200
+    assert client.patch(f"/transactions/{completed}/claim-received", headers=recycler).status_code == 409
+    assert client.patch(f"/transactions/{completed}/confirm-handover", headers=producer).status_code == 200
+    cancelled = book(client, recycler, create_waste(client, producer, "Kertas", 4, 500))
+    assert client.delete(f"/transactions/{cancelled}/cancel", headers=recycler).status_code == 200
+    before = impact_views(client, producer, recycler)
+
+    # Klik ganda / request diulang: ditolak 409, rekap tidak berubah
+    assert client.patch(f"/transactions/{completed}/confirm-handover", headers=producer).status_code == 409
+    assert client.delete(f"/transactions/{completed}/cancel", headers=producer).status_code == 409
+    assert client.delete(f"/transactions/{cancelled}/cancel", headers=recycler).status_code == 409
+    assert client.delete(f"/transactions/{cancelled}/cancel", headers=producer).status_code == 409
+
+    assert impact_views(client, producer, recycler) == before
+    (producer_impact, _), _ = assert_rollups_match_rebuild(client, session, producer, recycler)
+    assert producer_impact["total_waste_managed_kg"] == 10
+    assert producer_impact["completed_transactions"] == 1
+    assert producer_impact["available_wastes"] == 1
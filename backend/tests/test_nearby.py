@@ -0,0 +1,86 @@
+# tests/test_nearby.py
+# GET /wastes/nearby mencari lewat sel geohash yang menutupi area. Titik yang berdekatan tapi
+# beda sel (prefix geohash beda sejak karakter pertama di ekuator / meridian 0) harus tetap ketemu.
+import math
+import random
+import pytest
+from app.geo import bbox_around, cell_size, cover_bbox, encode_geohash
+
+# Pojok sel geohash presisi 5 di sekitar Jakarta: empat sel bertetangga bertemu di titik ini
+_CELL_LAT, _CELL_LON = cell_size(5)
+JAKARTA_CORNER = (math.floor(-6.2 / _CELL_LAT) * _CELL_LAT, math.floor(106.8 / _CELL_LON) * _CELL_LON)
+
+
+def create_waste(client, headers, latitude, longitude, title="Botol PET", category="Plastik"):
+    response = client.post("/wastes/", headers=headers, json={
+        "title": title, "category": category, "weight": 1, "price": 100,
+        "latitude": latitude, "longitude": longitude,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def around(center, offset):
+    """Satu titik di tiap kuadran sekitar center (tiap titik di sel geohash yang berbeda)"""
+    lat, lon = center
+    return [(lat + d_lat, lon + d_lon) for d_lat in (offset, -offset) for d_lon in (offset, -offset)]
+
+
+@pytest.mark.parametrize("center", [(0.0, 0.0), JAKARTA_CORNER])
+def test_radius_search_finds_neighbours_across_cell_edges(client, register, center):
+    producer = register("producer@test.id", "producer")
+    points = around(center, 0.001)  # ~150m dari pusat
+    assert len({encode_geohash(lat, lon, 5) for lat, lon in points}) == 4
+    near_ids = [create_waste(client, producer, lat, lon) for lat, lon in points]
+    far_id = create_waste(client, producer, center[0] + 0.05, center[1])  # ~5.5km
+
+    response = client.get("/wastes/nearby", params={"lat": center[0], "lon": center[1], "radius_km": 1})
+
+    assert response.status_code == 200, response.text
+    results = response.json()
+    assert sorted(item["id"] for item in results) == sorted(near_ids)
+    assert far_id not in [item["id"] for item in results]
+    assert all(item["distance_km"] < 0.2 for item in results)
+    distances = [item["distance_km"] for item in results]
+    assert distances == sorted(distances)
+
+
+def test_bounding_box_excludes_points_outside_box_in_same_cell(client, register):
+    producer = register("producer@test.id", "producer")
+    lat, lon = JAKARTA_CORNER
+    inside_id = create_waste(client, producer, lat + 0.001, lon + 0.001)
+    create_waste(client, producer, lat + 0.003, lon + 0.001)
+    assert encode_geohash(lat + 0.001, lon + 0.001, 4) == encode_geohash(lat + 0.003, lon + 0.001, 4)
+
+    response = client.get("/wastes/nearby", params={
+        "min_lat": lat, "min_lon": lon, "max_lat": lat + 0.002, "max_lon": lon + 0.002,
+    })
+
+    assert response.status_code == 200, response.text
+    assert [item["id"] for item in response.json()] == [inside_id]
+
+
+def test_only_available_wastes_within_radius(client, register):
+    producer = register("producer@test.id", "producer")
+    recycler = register("recycler@test.id", "recycler")
+    lat, lon = JAKARTA_CORNER
+    available_id = create_waste(client, producer, lat + 0.001, lon + 0.001)
+    booked_id = create_waste(client, producer, lat - 0.001, lon - 0.001)
+    client.post(f"/transactions/book/{booked_id}", headers=recycler, json={"waste_id": booked_id})
+
+    response = client.get("/wastes/nearby", params={"lat": lat, "lon": lon, "radius_km": 1})
+
+    assert [item["id"] for item in response.json()] == [available_id]
+
+
+def test_cover_bbox_contains_every_point_in_box():
+    rng = random.Random(7)
+    for center in [(0.0, 0.0), JAKARTA_CORNER, (-6.2, 106.8), (89.9, 179.9), (-89.9, -179.9)]:
+        for radius_km in (0.05, 1, 10, 200):
+            bbox = bbox_around(*center, radius_km)
+            cells = cover_bbox(*bbox)
+            corners = [(bbox[0], bbox[1]), (bbox[0], bbox[3]), (bbox[2], bbox[1]), (bbox[2], bbox[3])]
+            samples = [(rng.uniform(bbox[0], bbox[2]), rng.uniform(bbox[1], bbox[3])) for _ in range(200)]
+            for point in corners + samples:
+                geohash = encode_geohash(*point)
+                assert any(geohash.startswith(cell) for cell in cells), (center, radius_km, point)
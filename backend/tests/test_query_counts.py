@@ -0,0 +1,57 @@
+# tests/test_query_counts.py
+# Jumlah statement SQL per request harus tetap (tidak tumbuh dengan jumlah baris / N+1).
+# Cache user dimatikan di conftest, jadi tiap request ber-token = 1 SELECT user + query route.
+from contextlib import contextmanager
+from sqlalchemy import event
+
+AUTH_QUERIES = 1
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seed_bookings(client, producer, recycler, count):
+    transactions = []
+    for index in range(count):
+        waste = client.post("/wastes/", headers=producer, json={
+            "title": f"Kardus {index}", "category": "Kertas", "weight": 2, "price": 200,
+        }).json()
+        transactions.append((waste["id"], client.post(f"/transactions/book/{waste['id']}", headers=recycler, json={
+            "waste_id": waste["id"],
+        }).json()["id"]))
+    return transactions
+
+
+def test_transaction_reads_use_fixed_statement_count(client, register, db):
+    producer = register("producer@test.id", "producer")
+    recycler = register("recycler@test.id", "recycler")
+    bookings = seed_bookings(client, producer, recycler, 5)
+    waste_id, transaction_id = bookings[-1]
+
+    with count_statements(db) as statements:
+        response = client.get("/transactions/my-bookings", headers=recycler)
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    assert len(statements) == AUTH_QUERIES + 1, statements
+
+    with count_statements(db) as statements:
+        response = client.get(f"/transactions/{transaction_id}/payment-details", headers=recycler)
+    assert response.status_code == 200
+    assert len(statements) == AUTH_QUERIES + 1, statements
+
+    with count_statements(db) as statements:
+        response = client.get(f"/transactions/waste/{waste_id}", headers=producer)
+    assert response.status_code == 200
+    assert response.json()["recycler"]["id"]
+    assert len(statements) == AUTH_QUERIES + 1, statements
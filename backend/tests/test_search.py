@@ -0,0 +1,98 @@
+# tests/test_search.py
+# GET /wastes/search: input user tidak pernah diteruskan mentah ke sintaks FTS5 / tsquery,
+# dan paging cursor relevansi (skor, id) tidak melewatkan atau mengulang hasil, termasuk saat skor seri.
+import pytest
+from app.pagination import NEXT_CURSOR_HEADER
+
+
+def create_waste(client, headers, title, description=None, category="Plastik"):
+    response = client.post("/wastes/", headers=headers, json={
+        "title": title, "description": description, "category": category, "weight": 1, "price": 100,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def search_all_pages(client, params, limit):
+    """Ikuti X-Next-Cursor sampai habis, return (id per halaman)"""
+    pages = []
+    cursor = None
+    for _ in range(100):  # Cursor yang tidak maju jangan sampai bikin test hang
+        page_params = {**params, "limit": limit, "cursor": cursor} if cursor else {**params, "limit": limit}
+        response = client.get("/wastes/search", params=page_params)
+        assert response.status_code == 200, response.text
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return pages
+    raise AssertionError(f"Cursor tidak pernah habis: {pages[-3:]}")
+
+
+@pytest.mark.parametrize("q", [
+    'botol"', '"botol', "botol*", "botol:*", "(botol", "NEAR(botol", "^botol", "botol' --",
+    "botol & !", "botol OR drink", "NOT food", "botol AND", "title:botol", "botol -near", "botol | pet",
+])
+def test_operators_in_query_are_treated_as_words(client, register, q):
+    producer = register("producer@test.id", "producer")
+    # Kata operator FTS5 (AND, OR, NOT, NEAR) & nama kolom ada di teks sebagai kata biasa
+    bottle_id = create_waste(client, producer, "Botol PET bening", "title: NOT for food AND drink OR near")
+    create_waste(client, producer, "Kardus bekas", "Kardus cokelat", category="Kertas")
+
+    response = client.get("/wastes/search", params={"q": q})
+
+    assert response.status_code == 200, response.text
+    assert [item["id"] for item in response.json()] == [bottle_id]
+
+
+@pytest.mark.parametrize("q", ["!!!", "*", '""', "&|"])
+def test_query_without_words_is_rejected(client, q):
+    assert client.get("/wastes/search", params={"q": q}).status_code == 400
+
+
+def test_every_word_must_match_as_prefix(client, register):
+    producer = register("producer@test.id", "producer")
+    both_id = create_waste(client, producer, "Botolan plastik", "bekas minuman")
+    create_waste(client, producer, "Botol kaca", "bekas sirup", category="Kaca")
+
+    response = client.get("/wastes/search", params={"q": "BOTOL Plast"})
+
+    assert [item["id"] for item in response.json()] == [both_id]
+
+
+def test_booked_wastes_are_not_found(client, register):
+    producer = register("producer@test.id", "producer")
+    recycler = register("recycler@test.id", "recycler")
+    waste_id = create_waste(client, producer, "Botol PET")
+    client.post(f"/transactions/book/{waste_id}", headers=recycler, json={"waste_id": waste_id})
+
+    assert client.get("/wastes/search", params={"q": "botol"}).json() == []
+
+
+def test_relevance_cursor_pages_cover_results_once(client, register):
+    producer = register("producer@test.id", "producer")
+    # Skor bertingkat (kata kunci muncul 1-3 kali) dan banyak yang seri (teks identik)
+    best_ids = [create_waste(client, producer, "Botol botol botol", "botol bekas") for _ in range(3)]
+    for index in range(4):
+        create_waste(client, producer, "Botol PET", f"bekas minuman {index}")
+    for _ in range(4):
+        create_waste(client, producer, "Botol PET", "bekas minuman")
+    create_waste(client, producer, "Kardus", "bukan plastik", category="Kertas")
+
+    full = search_all_pages(client, {"q": "botol"}, limit=100)
+    assert len(full) == 1 and len(full[0]) == 11
+    # Paling relevan dulu, yang seri urut id terbaru
+    assert full[0][:3] == list(reversed(best_ids))
+
+    for limit in (1, 2, 3, 5):
+        pages = search_all_pages(client, {"q": "botol"}, limit=limit)
+        assert [waste_id for page in pages for waste_id in page] == full[0], limit
+        assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_newest_sort_pages_by_creation(client, register):
+    producer = register("producer@test.id", "producer")
+    ids = [create_waste(client, producer, f"Botol {index}") for index in range(5)]
+
+    pages = search_all_pages(client, {"q": "botol", "sort": "newest"}, limit=2)
+
+    assert [waste_id for page in pages for waste_id in page] == list(reversed(ids))
@@ -0,0 +1,66 @@
+# tests/test_upload_images.py
+# Upload gambar: resolusi di atas IMAGE_MAX_PIXELS ditolak dari header (tanpa decode piksel)
+# dan file aslinya dibuang; gambar normal menghasilkan semua varian dengan ukuran yang benar.
+import io
+import struct
+import zlib
+import pytest
+from PIL import Image
+from app.images import IMAGE_VARIANTS, MAX_IMAGE_PIXELS
+from app.routes import upload
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload, "UPLOAD_DIR", tmp_path / "uploads")
+    monkeypatch.setattr(upload, "UPLOAD_TMP_DIR", tmp_path / "tmp")
+    upload.UPLOAD_DIR.mkdir()
+    upload.UPLOAD_TMP_DIR.mkdir()
+    return upload.UPLOAD_DIR
+
+
+def png_header_only(width: int, height: int) -> bytes:
+    """PNG 1-bit yang mengaku width x height, IDAT-nya hanya satu baris (tidak pernah di-decode)"""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 1, 0, 0, 0, 0)
+    row = zlib.compress(b"\0" * (1 + (width + 7) // 8))
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", row) + chunk(b"IEND", b"")
+
+
+def uploaded_files(upload_dir):
+    return [path for path in upload_dir.rglob("*") if path.is_file()]
+
+
+@pytest.mark.parametrize("width, height", [
+    (7000, 7000),  # Di atas batas: ditolak cek ukuran sendiri
+    (20000, 20000),  # Di atas 2x batas: Pillow sudah menolak saat open (DecompressionBombError)
+])
+def test_oversized_image_is_rejected_and_removed(client, upload_dir, width, height):
+    assert width * height > MAX_IMAGE_PIXELS
+
+    response = client.post("/upload/image", files={
+        "file": ("bom.png", png_header_only(width, height), "image/png"),
+    })
+
+    assert response.status_code == 400, response.text
+    assert "megapiksel" in response.json()["detail"]
+    assert uploaded_files(upload_dir) == []
+
+
+@pytest.mark.parametrize("mode", ["RGB", "P", "1"])
+def test_upload_creates_downscaled_variants(client, upload_dir, mode):
+    buffer = io.BytesIO()
+    Image.new("RGB", (2000, 1000), "green").convert(mode).save(buffer, "PNG")
+
+    response = client.post("/upload/image", files={"file": ("foto.png", buffer.getvalue(), "image/png")})
+
+    assert response.status_code == 200, response.text
+    variants = response.json()["variants"]
+    assert list(variants) == list(IMAGE_VARIANTS)
+    for name, url in variants.items():
+        with Image.open(upload_dir / url.removeprefix("/uploads/")) as image:
+            assert image.size == (IMAGE_VARIANTS[name], IMAGE_VARIANTS[name] // 2)
+            assert image.mode == "RGB"
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { wasteAPI, transactionAPI } from '../services/api';
-import { Search, Filter, Package, AlertCircle, CheckCircle, TrendingUp, Leaf, Star, LayoutGrid, List, Heart, ChevronLeft, ChevronRight } from 'lucide-react';
+import { Search, Filter, Package, AlertCircle, CheckCircle, TrendingUp, Leaf, Star, LayoutGrid, List, Heart } from 'lucide-react';
 import WasteCard from '../components/waste/WasteCard';
 import WasteListItem from '../components/waste/WasteListItem';
 import BookingModal from '../components/waste/BookingModal';
@@ -10,6 +10,8 @@ const Marketplace = () => {
   const [wastes, setWastes] = useState([]);
   const [filteredWastes, setFilteredWastes] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
   const [selectedCategory, setSelectedCategory] = useState('all');
   const [searchTerm, setSearchTerm] = useState('');
   const [message, setMessage] = useState({ type: '', text: '' });
@@ -18,16 +20,12 @@ const Marketplace = () => {
   const [viewMode, setViewMode] = useState('card'); // 'card' or 'list'
   const [wishlist, setWishlist] = useState([]);
 
-  const [currentPage, setCurrentPage] = useState(1);
-  const itemsPerPage = 9;
-
   const { user, isAuthenticated } = useAuth();
   const userRole = user?.role;
 
   const categories = ['all', 'Minyak', 'Plastik', 'Organik', 'Kertas', 'Logam'];
 
   useEffect(() => {
-    fetchWastes();
     // Load wishlist from localStorage
     const savedWishlist = localStorage.getItem(`wishlist_${user?.id}`);
     if (savedWishlist) {
@@ -35,20 +33,23 @@ const Marketplace = () => {
     }
   }, [user?.id]);
 
+  // Filter kategori di server: ganti kategori = mulai lagi dari halaman pertama
+  useEffect(() => {
+    fetchWastes();
+  }, [selectedCategory]);
+
   useEffect(() => {
     filterWastes();
-    setCurrentPage(1); 
-  }, [selectedCategory, searchTerm, wastes]);
+  }, [searchTerm, wastes]);
 
-  const fetchWastes = async () => {
+  // cursor null = halaman pertama (ganti list), ada cursor = halaman berikutnya (tambahkan ke list)
+  const fetchWastes = async (cursor = null) => {
     try {
-      setLoading(true);
-      const response = await wasteAPI.getAll();
-      // Sort by created_at descending (terbaru di atas/kiri)
-      const sortedWastes = response.data.sort((a, b) =>
-        new Date(b.created_at) - new Date(a.created_at)
-      );
-      setWastes(sortedWastes);
+      cursor ? setLoadingMore(true) : setLoading(true);
+      // Urutan terbaru dulu sudah dari server (keyset created_at DESC)
+      const response = await wasteAPI.getAll({ category: selectedCategory, cursor });
+      setWastes(prev => (cursor ? [...prev, ...response.data] : response.data));
+      setNextCursor(response.nextCursor);
     } catch (error) {
       console.error('Error fetching wastes:', error);
       setMessage({
@@ -57,18 +58,14 @@ const Marketplace = () => {
       });
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
   const filterWastes = () => {
     let filtered = [...wastes];
 
-    // Filter by category
-    if (selectedCategory !== 'all') {
-      filtered = filtered.filter(waste => waste.category === selectedCategory);
-    }
-
-    // Filter by search term
+    // Filter by search term (di halaman yang sudah dimuat)
     if (searchTerm) {
       filtered = filtered.filter(waste =>
         waste.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
@@ -141,15 +138,8 @@ const Marketplace = () => {
   };
 
   const stats = getQuickStats();
-  const indexOfLastItem = currentPage * itemsPerPage;
-  const indexOfFirstItem = indexOfLastItem - itemsPerPage;
-  const currentItems = filteredWastes.slice(indexOfFirstItem, indexOfLastItem);
-  const totalPages = Math.ceil(filteredWastes.length / itemsPerPage);
-
-  const handlePageChange = (pageNumber) => {
-    setCurrentPage(pageNumber);
-    window.scrollTo({ top: 0, behavior: 'smooth' });
-  };
+  // Masih ada halaman berikutnya: angka di bawah hanya untuk limbah yang sudah dimuat
+  const moreSuffix = nextCursor ? '+' : '';
 
   return (
     <div className="min-h-screen bg-gray-50 py-4 sm:py-6 md:py-8">
@@ -171,7 +161,7 @@ const Marketplace = () => {
               <div className="bg-white/20 w-10 h-10 sm:w-12 sm:h-12 rounded-full flex items-center justify-center mx-auto mb-2">
                 <Leaf className="w-5 h-5 sm:w-6 sm:h-6" />
               </div>
-              <p className="text-xl sm:text-2xl md:text-3xl font-bold">{filteredWastes.length}</p>
+              <p className="text-xl sm:text-2xl md:text-3xl font-bold">{filteredWastes.length}{moreSuffix}</p>
               <p className="text-[10px] sm:text-xs font-medium opacity-90 mt-0.5">Limbah Tersedia</p>
             </div>
 
@@ -179,7 +169,7 @@ const Marketplace = () => {
               <div className="bg-white/20 w-10 h-10 sm:w-12 sm:h-12 rounded-full flex items-center justify-center mx-auto mb-2">
                 <TrendingUp className="w-5 h-5 sm:w-6 sm:h-6" />
               </div>
-              <p className="text-xl sm:text-2xl md:text-3xl font-bold">{stats.totalWeight.toFixed(1)}</p>
+              <p className="text-xl sm:text-2xl md:text-3xl font-bold">{stats.totalWeight.toFixed(1)}{moreSuffix}</p>
               <p className="text-[10px] sm:text-xs font-medium opacity-90 mt-0.5">Total Kg</p>
             </div>
 
@@ -187,7 +177,7 @@ const Marketplace = () => {
               <div className="bg-white/20 w-10 h-10 sm:w-12 sm:h-12 rounded-full flex items-center justify-center mx-auto mb-2">
                 <Star className="w-5 h-5 sm:w-6 sm:h-6" />
               </div>
-              <p className="text-xl sm:text-2xl md:text-3xl font-bold">{stats.freeItems}</p>
+              <p className="text-xl sm:text-2xl md:text-3xl font-bold">{stats.freeItems}{moreSuffix}</p>
               <p className="text-[10px] sm:text-xs font-medium opacity-90 mt-0.5">Gratis</p>
             </div>
 
@@ -260,7 +250,7 @@ const Marketplace = () => {
           {/* Results count & View Toggle */}
           <div className="mt-4 flex flex-col sm:flex-row sm:items-center sm:justify-between gap-3">
             <div className="text-sm text-gray-600">
-              Menampilkan {indexOfFirstItem + 1}-{Math.min(indexOfLastItem, filteredWastes.length)} dari {filteredWastes.length} limbah
+              Menampilkan {filteredWastes.length}{moreSuffix} limbah
             </div>
             <div className="flex items-center gap-1 bg-gray-100 p-1 rounded-lg">
               <button
@@ -310,7 +300,7 @@ const Marketplace = () => {
           <>
             {viewMode === 'card' ? (
               <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-3 sm:gap-4 md:gap-6">
-                {currentItems.map(waste => (
+                {filteredWastes.map(waste => (
                   <WasteCard
                     key={waste.id}
                     waste={waste}
@@ -325,7 +315,7 @@ const Marketplace = () => {
               </div>
             ) : (
               <div className="flex flex-col gap-3">
-                {currentItems.map(waste => (
+                {filteredWastes.map(waste => (
                   <WasteListItem
                     key={waste.id}
                     waste={waste}
@@ -340,39 +330,15 @@ const Marketplace = () => {
               </div>
             )}
 
-            {/* --- PAGINATION CONTROLS --- */}
-            {totalPages > 1 && (
-              <div className="flex justify-center items-center mt-8 gap-2">
-                <button
-                  onClick={() => handlePageChange(currentPage - 1)}
-                  disabled={currentPage === 1}
-                  className="p-2 rounded-lg border border-gray-300 bg-white text-gray-600 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
-                >
-                  <ChevronLeft className="w-5 h-5" />
-                </button>
-                
-                <div className="flex gap-1">
-                  {Array.from({ length: totalPages }, (_, i) => i + 1).map(number => (
-                    <button
-                      key={number}
-                      onClick={() => handlePageChange(number)}
-                      className={`w-10 h-10 rounded-lg text-sm font-medium transition-colors ${
-                        currentPage === number
-                          ? 'bg-green-600 text-white'
-                          : 'bg-white text-gray-600 hover:bg-gray-50 border border-gray-300'
-                      }`}
-                    >
-                      {number}
-                    </button>
-                  ))}
-                </div>
-
+            {/* --- MUAT LEBIH BANYAK (cursor X-Next-Cursor) --- */}
+            {nextCursor && (
+              <div className="flex justify-center mt-8">
                 <button
-                  onClick={() => handlePageChange(currentPage + 1)}
-                  disabled={currentPage === totalPages}
-                  className="p-2 rounded-lg border border-gray-300 bg-white text-gray-600 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
+                  onClick={() => fetchWastes(nextCursor)}
+                  disabled={loadingMore}
+                  className="px-6 py-2 rounded-lg border border-gray-300 bg-white text-sm font-medium text-gray-700 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
                 >
-                  <ChevronRight className="w-5 h-5" />
+                  {loadingMore ? 'Memuat...' : 'Muat lebih banyak'}
                 </button>
               </div>
             )}
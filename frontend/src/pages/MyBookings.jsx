@@ -1,6 +1,6 @@
 import { useState, useEffect, useMemo } from 'react';
 import { useAuth } from '../context/AuthContext';
-import { transactionAPI, wasteAPI } from '../services/api';
+import { transactionAPI } from '../services/api';
 import { Package, CheckCircle, Clock, XCircle, Calendar, MapPin, Phone, User, Truck, Eye, X, Navigation, DollarSign, Filter, CreditCard, AlertCircle } from 'lucide-react';
 import Button from '../components/common/Button';
 import MapViewer from '../components/map/MapViewer';
@@ -9,8 +9,10 @@ import toast, { Toaster } from 'react-hot-toast';
 
 const MyBookings = () => {
   const [bookings, setBookings] = useState([]);
-  const [wastesData, setWastesData] = useState({});
+  const [summary, setSummary] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
   const [selectedBooking, setSelectedBooking] = useState(null);
   const [showDetailModal, setShowDetailModal] = useState(false);
   const [showPaymentModal, setShowPaymentModal] = useState(false);
@@ -26,41 +28,28 @@ const MyBookings = () => {
     { key: 'completed', label: 'Selesai' },
   ];
 
-  // Filter bookings based on active filter
-  const filteredBookings = bookings.filter((booking) => {
-    if (activeFilter === 'all') return true;
-    return booking.status === activeFilter;
-  });
-
+  // Filter status di server: ganti filter = mulai lagi dari halaman pertama
   useEffect(() => {
     if (user?.role === 'recycler') {
       fetchMyBookings();
     }
-  }, [user]);
+  }, [user, activeFilter]);
+
+  // Limbah ikut di response (TransactionRead.waste), tidak perlu request per booking
+  const withWaste = (items) => items.filter((booking) => booking.waste);
 
+  // Halaman pertama + ringkasan jumlah per status (dipanggil ulang setelah klaim/batal/bayar)
   const fetchMyBookings = async () => {
     try {
       setLoading(true);
-      const response = await transactionAPI.getMyBookings();
-      const bookingsData = response.data;
-
-      // Sort by created_at descending (terbaru di atas)
-      const sortedBookings = bookingsData.sort((a, b) =>
-        new Date(b.created_at) - new Date(a.created_at)
-      );
-      setBookings(sortedBookings);
-
-      // Fetch waste data for each booking
-      const wastesMap = {};
-      for (const booking of sortedBookings) {
-        try {
-          const wasteResponse = await wasteAPI.getById(booking.waste_id);
-          wastesMap[booking.waste_id] = wasteResponse.data;
-        } catch (error) {
-          console.error(`Error fetching waste ${booking.waste_id}:`, error);
-        }
-      }
-      setWastesData(wastesMap);
+      const [response, summaryResponse] = await Promise.all([
+        transactionAPI.getMyBookings({ status: activeFilter }),
+        transactionAPI.getMyBookingsSummary(),
+      ]);
+      // Urutan terbaru dulu sudah dari server (sort=newest)
+      setBookings(withWaste(response.data));
+      setNextCursor(response.nextCursor);
+      setSummary(summaryResponse.data);
     } catch (error) {
       console.error('Error fetching bookings:', error);
       toast.error('Gagal memuat data booking');
@@ -69,6 +58,26 @@ const MyBookings = () => {
     }
   };
 
+  const fetchMoreBookings = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await transactionAPI.getMyBookings({ status: activeFilter, cursor: nextCursor });
+      setBookings(prev => [...prev, ...withWaste(response.data)]);
+      setNextCursor(response.nextCursor);
+    } catch (error) {
+      console.error('Error fetching bookings:', error);
+      toast.error('Gagal memuat data booking');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Jumlah per status dari /transactions/my-bookings/summary (bukan dari halaman yang sudah dimuat)
+  const countByStatus = (status) => {
+    if (!summary) return 0;
+    return status === 'all' ? summary.total : (summary.by_status[status] || 0);
+  };
+
   const handleClaimReceived = async (bookingId, transportMethod) => {
     const isDelivery = transportMethod === 'delivery';
     const confirmMessage = isDelivery
@@ -201,9 +210,7 @@ const MyBookings = () => {
                 className="w-full appearance-none bg-white border border-gray-200 rounded-lg pl-10 pr-10 py-2.5 sm:py-3 text-sm sm:text-base text-gray-700 font-medium focus:outline-none focus:ring-2 focus:ring-green-500 focus:border-transparent shadow-sm cursor-pointer"
               >
                 {filterOptions.map((option) => {
-                  const count = option.key === 'all'
-                    ? bookings.length
-                    : bookings.filter(b => b.status === option.key).length;
+                  const count = countByStatus(option.key);
                   return (
                     <option key={option.key} value={option.key}>
                       {option.label} ({count})
@@ -219,7 +226,7 @@ const MyBookings = () => {
             </div>
             {/* Result count badge */}
             <div className="hidden sm:flex items-center gap-2 text-sm text-gray-500">
-              <span className="font-medium text-gray-900">{filteredBookings.length}</span>
+              <span className="font-medium text-gray-900">{countByStatus(activeFilter)}</span>
               <span>booking ditemukan</span>
             </div>
           </div>
@@ -230,7 +237,7 @@ const MyBookings = () => {
           <div className="flex justify-center items-center py-20">
             <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-green-600"></div>
           </div>
-        ) : bookings.length === 0 ? (
+        ) : countByStatus('all') === 0 ? (
           <div className="bg-white rounded-xl shadow-md p-12 text-center">
             <Package className="w-16 h-16 text-gray-400 mx-auto mb-4" />
             <h3 className="text-xl font-semibold text-gray-900 mb-2">
@@ -240,7 +247,7 @@ const MyBookings = () => {
               Mulai cari limbah di Marketplace dan buat booking pertama Anda
             </p>
           </div>
-        ) : filteredBookings.length === 0 ? (
+        ) : bookings.length === 0 ? (
           <div className="bg-white rounded-xl shadow-md p-12 text-center">
             <Package className="w-16 h-16 text-gray-400 mx-auto mb-4" />
             <h3 className="text-xl font-semibold text-gray-900 mb-2">
@@ -252,9 +259,8 @@ const MyBookings = () => {
           </div>
         ) : (
           <div className="space-y-4">
-            {filteredBookings.map((booking) => {
-              const waste = wastesData[booking.waste_id];
-              if (!waste) return null;
+            {bookings.map((booking) => {
+              const waste = booking.waste;
 
               return (
                 <div key={booking.id} className="bg-white rounded-xl shadow-md overflow-hidden hover:shadow-lg transition-shadow">
@@ -395,6 +401,13 @@ const MyBookings = () => {
                 </div>
               );
             })}
+            {nextCursor && (
+              <div className="flex justify-center pt-4">
+                <Button variant="outline" onClick={fetchMoreBookings} disabled={loadingMore}>
+                  {loadingMore ? 'Memuat...' : 'Muat lebih banyak'}
+                </Button>
+              </div>
+            )}
           </div>
         )}
 
@@ -402,7 +415,7 @@ const MyBookings = () => {
         {showDetailModal && selectedBooking && (
           <BookingDetailModal
             booking={selectedBooking}
-            waste={wastesData[selectedBooking.waste_id]}
+            waste={selectedBooking.waste}
             onClose={() => {
               setShowDetailModal(false);
               setSelectedBooking(null);
@@ -414,7 +427,7 @@ const MyBookings = () => {
         {showPaymentModal && selectedBooking && (
           <PaymentModal
             booking={selectedBooking}
-            waste={wastesData[selectedBooking.waste_id]}
+            waste={selectedBooking.waste}
             onClose={() => {
               setShowPaymentModal(false);
               setSelectedBooking(null);
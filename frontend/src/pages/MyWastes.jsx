@@ -13,7 +13,10 @@ import toast, { Toaster } from 'react-hot-toast';
 
 const MyWastes = () => {
   const [wastes, setWastes] = useState([]);
+  const [summary, setSummary] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
   const [showModal, setShowModal] = useState(false);
   const [showEditModal, setShowEditModal] = useState(false);
   const [editingWaste, setEditingWaste] = useState(null);
@@ -55,20 +58,25 @@ const MyWastes = () => {
     }
   }, [formData.category, formData.weight]);
 
+  // Filter status di server: ganti filter = mulai lagi dari halaman pertama
   useEffect(() => {
     if (user?.role === 'producer') {
       fetchMyWastes();
     }
-  }, [user]);
+  }, [user, filterStatus]);
 
+  // Halaman pertama + ringkasan jumlah per status (dipanggil ulang setelah create/edit/delete)
   const fetchMyWastes = async () => {
     try {
       setLoading(true);
-      const response = await wasteAPI.getMyWastes();
-      const sortedWastes = response.data.sort((a, b) =>
-        new Date(b.created_at) - new Date(a.created_at)
-      );
-      setWastes(sortedWastes);
+      const [response, summaryResponse] = await Promise.all([
+        wasteAPI.getMyWastes({ status: filterStatus }),
+        wasteAPI.getMySummary(),
+      ]);
+      setSummary(summaryResponse.data);
+      // Urutan terbaru dulu sudah dari server (sort=newest)
+      setWastes(response.data);
+      setNextCursor(response.nextCursor);
     } catch (error) {
       console.error('Error fetching wastes:', error);
       toast.error('Gagal memuat data limbah');
@@ -77,13 +85,25 @@ const MyWastes = () => {
     }
   };
 
-  const filteredWastes = wastes.filter(waste => {
-    if (filterStatus === 'all') return true;
-    if (filterStatus === 'available') return waste.status === 'available';
-    if (filterStatus === 'booked') return waste.status === 'booked';
-    if (filterStatus === 'completed') return waste.status === 'completed';
-    return true;
-  });
+  const fetchMoreWastes = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await wasteAPI.getMyWastes({ status: filterStatus, cursor: nextCursor });
+      setWastes(prev => [...prev, ...response.data]);
+      setNextCursor(response.nextCursor);
+    } catch (error) {
+      console.error('Error fetching wastes:', error);
+      toast.error('Gagal memuat data limbah');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Jumlah per status dari /wastes/me/summary (dihitung di server, bukan dari halaman yang sudah dimuat)
+  const countByStatus = (status) => {
+    if (!summary) return 0;
+    return status === 'all' ? summary.total : (summary.by_status[status]?.count || 0);
+  };
 
   const resetForm = () => {
     setFormData({
@@ -290,10 +310,10 @@ const MyWastes = () => {
             <button onClick={() => setShowFilterDropdown(!showFilterDropdown)} className="flex items-center gap-2 px-4 py-2 bg-white border border-gray-300 rounded-lg hover:bg-gray-50 transition-all text-sm font-medium text-gray-700">
               <Filter className="w-4 h-4" />
               <span>
-                {filterStatus === 'all' && `Semua (${wastes.length})`}
-                {filterStatus === 'available' && `Tersedia (${wastes.filter(w => w.status === 'available').length})`}
-                {filterStatus === 'booked' && `Dipesan (${wastes.filter(w => w.status === 'booked').length})`}
-                {filterStatus === 'completed' && `Selesai (${wastes.filter(w => w.status === 'completed').length})`}
+                {filterStatus === 'all' && `Semua (${countByStatus('all')})`}
+                {filterStatus === 'available' && `Tersedia (${countByStatus('available')})`}
+                {filterStatus === 'booked' && `Dipesan (${countByStatus('booked')})`}
+                {filterStatus === 'completed' && `Selesai (${countByStatus('completed')})`}
               </span>
               <ChevronDown className={`w-4 h-4 transition-transform ${showFilterDropdown ? 'rotate-180' : ''}`} />
             </button>
@@ -301,10 +321,10 @@ const MyWastes = () => {
               <>
                 <div className="fixed inset-0 z-10" onClick={() => setShowFilterDropdown(false)} />
                 <div className="absolute top-full left-0 mt-1 w-48 bg-white border border-gray-200 rounded-lg shadow-lg z-20 py-1">
-                  <button onClick={() => { setFilterStatus('all'); setShowFilterDropdown(false); }} className="w-full px-4 py-2 text-left text-sm flex items-center gap-2 hover:bg-gray-50 text-gray-700"><Package className="w-4 h-4" /> Semua ({wastes.length})</button>
-                  <button onClick={() => { setFilterStatus('available'); setShowFilterDropdown(false); }} className="w-full px-4 py-2 text-left text-sm flex items-center gap-2 hover:bg-gray-50 text-gray-700"><CheckCircle className="w-4 h-4" /> Tersedia ({wastes.filter(w => w.status === 'available').length})</button>
-                  <button onClick={() => { setFilterStatus('booked'); setShowFilterDropdown(false); }} className="w-full px-4 py-2 text-left text-sm flex items-center gap-2 hover:bg-gray-50 text-gray-700"><AlertCircle className="w-4 h-4" /> Dipesan ({wastes.filter(w => w.status === 'booked').length})</button>
-                  <button onClick={() => { setFilterStatus('completed'); setShowFilterDropdown(false); }} className="w-full px-4 py-2 text-left text-sm flex items-center gap-2 hover:bg-gray-50 text-gray-700"><CheckCircle className="w-4 h-4" /> Selesai ({wastes.filter(w => w.status === 'completed').length})</button>
+                  <button onClick={() => { setFilterStatus('all'); setShowFilterDropdown(false); }} className="w-full px-4 py-2 text-left text-sm flex items-center gap-2 hover:bg-gray-50 text-gray-700"><Package className="w-4 h-4" /> Semua ({countByStatus('all')})</button>
+                  <button onClick={() => { setFilterStatus('available'); setShowFilterDropdown(false); }} className="w-full px-4 py-2 text-left text-sm flex items-center gap-2 hover:bg-gray-50 text-gray-700"><CheckCircle className="w-4 h-4" /> Tersedia ({countByStatus('available')})</button>
+                  <button onClick={() => { setFilterStatus('booked'); setShowFilterDropdown(false); }} className="w-full px-4 py-2 text-left text-sm flex items-center gap-2 hover:bg-gray-50 text-gray-700"><AlertCircle className="w-4 h-4" /> Dipesan ({countByStatus('booked')})</button>
+                  <button onClick={() => { setFilterStatus('completed'); setShowFilterDropdown(false); }} className="w-full px-4 py-2 text-left text-sm flex items-center gap-2 hover:bg-gray-50 text-gray-700"><CheckCircle className="w-4 h-4" /> Selesai ({countByStatus('completed')})</button>
                 </div>
               </>
             )}
@@ -320,14 +340,14 @@ const MyWastes = () => {
           <div className="flex justify-center items-center py-20">
             <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-green-600"></div>
           </div>
-        ) : wastes.length === 0 ? (
+        ) : countByStatus('all') === 0 ? (
           <div className="bg-white rounded-xl shadow-md p-12 text-center">
             <Package className="w-16 h-16 text-gray-400 mx-auto mb-4" />
             <h3 className="text-xl font-semibold text-gray-900 mb-2">Belum Ada Limbah</h3>
             <p className="text-gray-600 mb-6">Mulai tambahkan limbah yang ingin Anda kelola</p>
             <Button onClick={() => setShowModal(true)}>Tambah Limbah Pertama</Button>
           </div>
-        ) : filteredWastes.length === 0 ? (
+        ) : wastes.length === 0 ? (
           <div className="bg-white rounded-xl shadow-md p-12 text-center">
             <Package className="w-16 h-16 text-gray-400 mx-auto mb-4" />
             <h3 className="text-xl font-semibold text-gray-900 mb-2">Tidak Ada Hasil</h3>
@@ -335,10 +355,10 @@ const MyWastes = () => {
           </div>
         ) : (
           <div>
-            <div className="mb-4 text-sm text-gray-600">Menampilkan {filteredWastes.length} dari {wastes.length} limbah</div>
+            <div className="mb-4 text-sm text-gray-600">Menampilkan {wastes.length} dari {countByStatus(filterStatus)} limbah</div>
             {viewMode === 'card' ? (
               <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-4 sm:gap-6">
-                {filteredWastes.map(waste => (
+                {wastes.map(waste => (
                   <div key={waste.id} className="relative">
                     <div className="bg-white rounded-xl shadow-md overflow-hidden">
                       <WasteCard waste={waste} userRole="producer" showActions={false} onViewDetails={(waste.status === 'booked' || waste.status === 'completed') ? handleViewBooking : null} />
@@ -364,7 +384,7 @@ const MyWastes = () => {
               </div>
             ) : (
               <div className="flex flex-col gap-3">
-                {filteredWastes.map(waste => (
+                {wastes.map(waste => (
                   <div key={waste.id} className="relative">
                     <WasteListItem waste={waste} userRole="producer" showActions={false} onViewDetails={(waste.status === 'booked' || waste.status === 'completed') ? handleViewBooking : null} />
                     <div className="absolute top-3 right-3 sm:top-4 sm:right-4 flex items-center gap-2">
@@ -382,6 +402,13 @@ const MyWastes = () => {
                 ))}
               </div>
             )}
+            {nextCursor && (
+              <div className="flex justify-center mt-8">
+                <Button variant="outline" onClick={fetchMoreWastes} disabled={loadingMore}>
+                  {loadingMore ? 'Memuat...' : 'Muat lebih banyak'}
+                </Button>
+              </div>
+            )}
           </div>
         )}
 
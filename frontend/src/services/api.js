@@ -20,6 +20,21 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// Endpoint list di backend dipaginasi (cursor di header X-Next-Cursor).
+// Satu panggilan = satu halaman; halaman berikutnya dimuat saat user klik "Muat lebih banyak".
+// Jumlah total / per status diambil dari endpoint /summary, bukan dari array yang sudah dimuat.
+export const PAGE_SIZE = 24;
+
+const getPage = async (url, { cursor, ...params } = {}) => {
+  const query = Object.fromEntries(
+    Object.entries(params).filter(([, value]) => value !== null && value !== undefined && value !== 'all')
+  );
+  const response = await api.get(url, {
+    params: { ...query, limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+  });
+  return { ...response, nextCursor: response.headers['x-next-cursor'] || null };
+};
+
 // Auth API
 export const authAPI = {
   register: (userData) => api.post('/auth/register', userData),
@@ -36,11 +51,12 @@ export const authAPI = {
 
 // Waste API - IMPROVED with CRUD
 export const wasteAPI = {
-  getAll: (category = null) => {
-    const url = category ? `/wastes/?category=${category}` : '/wastes/';
-    return api.get(url);
-  },
-  getMyWastes: () => api.get('/wastes/me'),
+  // params: { category, cursor } -> response.data (satu halaman) + response.nextCursor
+  getAll: (params = {}) => getPage('/wastes/', params),
+  // params: { status, cursor }
+  getMyWastes: (params = {}) => getPage('/wastes/me', params),
+  // Jumlah limbah per status (tanpa memuat semua baris)
+  getMySummary: () => api.get('/wastes/me/summary'),
   getById: (wasteId) => api.get(`/wastes/${wasteId}`),
   create: (wasteData) => api.post('/wastes/', wasteData),
   // 🔥 NEW: Update waste
@@ -82,7 +98,10 @@ export const transactionAPI = {
     api.patch(`/transactions/${transactionId}/confirm-handover`),
   cancel: (transactionId) => 
     api.delete(`/transactions/${transactionId}/cancel`),
-  getMyBookings: () => api.get('/transactions/my-bookings'),
+  // params: { status, cursor }
+  getMyBookings: (params = {}) => getPage('/transactions/my-bookings', params),
+  // Jumlah booking per status (tanpa memuat semua baris)
+  getMyBookingsSummary: () => api.get('/transactions/my-bookings/summary'),
   getImpact: () => api.get('/transactions/impact/me'),
   getChartData: () => api.get('/transactions/impact/chart-data'),
   getByWasteId: (wasteId) => api.get(`/transactions/waste/${wasteId}`),